@@ -53,6 +53,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.CommandRateLimitMiddleware',
+    'core.middleware.EventLogBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'EchoesOfValue.urls'
@@ -78,6 +80,12 @@ WSGI_APPLICATION = 'EchoesOfValue.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connections come from a psycopg 3 pool per worker process (DB_POOL). Pooling
+# replaces persistent connections, which Django cannot reuse safely across the
+# threads an ASGI worker runs sync code in. With DB_POOL=False each thread keeps
+# its connection for DB_CONN_MAX_AGE seconds instead.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -86,9 +94,32 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT', cast=int),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            },
+        } if DB_POOL else {},
     }
 }
 
+# Cache
+# Catalog and snapshot versions, zone presence, reputation and the leaderboard live
+# in the default cache, so every worker process has to share it: set REDIS_URL.
+# Without it each process gets its own memory cache, which is only correct with a
+# single worker. WEB_CONCURRENCY is the gunicorn worker count (gunicorn.conf.py);
+# core.checks refuses to run several workers on process-local state.
+
+REDIS_URL = config('REDIS_URL', default='')
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 
 # Password validation
@@ -137,4 +168,56 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
-}
\ No newline at end of file
+}
+
+# Event log buffering
+# EventLog.log() calls are collected per request (or per buffered_events() block)
+# and written with one bulk insert. EVENT_LOG_SYNC writes every event immediately.
+
+EVENT_LOG_SYNC = config('EVENT_LOG_SYNC', default=False, cast=bool)
+EVENT_LOG_BUFFER_SIZE = config('EVENT_LOG_BUFFER_SIZE', default=100, cast=int)
+EVENT_LOG_FLUSH_SECONDS = config('EVENT_LOG_FLUSH_SECONDS', default=1.0, cast=float)
+
+# Live event stream
+# Saved events are published to this broker and streamed to clients over SSE. The
+# LocalBroker only reaches clients connected to the same worker process; with
+# REDIS_URL set, events go through Redis to every worker.
+
+PUBSUB_BROKER = config('PUBSUB_BROKER', default='core.pubsub.RedisBroker' if REDIS_URL else 'core.pubsub.LocalBroker')
+EVENT_STREAM_KEEPALIVE_SECONDS = config('EVENT_STREAM_KEEPALIVE_SECONDS', default=15, cast=int)
+
+# Zone presence
+# Characters who have not moved for this long drop out of "who's here".
+
+PRESENCE_TTL_SECONDS = config('PRESENCE_TTL_SECONDS', default=900, cast=int)
+
+# Command rate limit
+# Each character may send COMMAND_RATE_LIMIT_BURST commands at once, then
+# COMMAND_RATE_LIMIT_PER_SECOND. Buckets live in the shared cache when REDIS_URL is
+# set, else in the (single) worker's memory. The limit applies before the request
+# is authenticated, so anyone can spend a character's tokens; against that kind of
+# griefing, COMMAND_RATE_LIMIT_PER_CLIENT gives every session (or address) its own
+# bucket per character, at the cost of letting a player multiply their limit.
+
+COMMAND_RATE_LIMIT_BACKEND = config(
+    'COMMAND_RATE_LIMIT_BACKEND', default='core.ratelimit.CacheBackend' if REDIS_URL else 'core.ratelimit.LocalBackend'
+)
+COMMAND_RATE_LIMIT_PER_CLIENT = config('COMMAND_RATE_LIMIT_PER_CLIENT', default=False, cast=bool)
+COMMAND_RATE_LIMIT_BURST = config('COMMAND_RATE_LIMIT_BURST', default=10, cast=int)
+COMMAND_RATE_LIMIT_PER_SECOND = config('COMMAND_RATE_LIMIT_PER_SECOND', default=1.0, cast=float)
+
+# Command history
+# For commands sent to the command endpoint (core.history.run_command), "ring" keeps
+# each character's last COMMAND_HISTORY_SIZE commands in CommandHistory, overwritten
+# in place. "audit" stores every command as a TextCommand row and logs it to the
+# EventLog, as TextCommand.objects.create() always does.
+
+COMMAND_HISTORY_MODE = config('COMMAND_HISTORY_MODE', default='ring')
+COMMAND_HISTORY_SIZE = config('COMMAND_HISTORY_SIZE', default=50, cast=int)
+
+# Energy
+# Energy regenerates by one point every ENERGY_REGEN_SECONDS up to ENERGY_MAX.
+# It is computed when read, so idle characters cost no writes.
+
+ENERGY_MAX = config('ENERGY_MAX', default=300, cast=int)
+ENERGY_REGEN_SECONDS = config('ENERGY_REGEN_SECONDS', default=60, cast=int)
@@ -1,6 +1,11 @@
 from django.contrib.auth.models import Group, User
 from rest_framework import serializers
 
+from core.models import (
+    Character, CharacterLocation, CharacterMission, CharacterStats, EventLog, EventLogArchive, InventoryItem,
+    Item, ItemType, Mission, MissionStep, MissionType, Rarity, Zone,
+)
+
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
@@ -11,4 +16,128 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
 class GroupSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Group
-        fields = ['url', 'name']
\ No newline at end of file
+        fields = ['url', 'name']
+
+
+class EventLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventLog
+        fields = ['id', 'message', 'timestamp']
+
+
+class EventLogArchiveSerializer(serializers.ModelSerializer):
+    events = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EventLogArchive
+        fields = ['id', 'period_start', 'period_end', 'count', 'events']
+
+    # Newest first, like the live feed
+    def get_events(self, archive):
+        return [{'message': message, 'timestamp': timestamp} for timestamp, message in reversed(archive.events)]
+
+
+class RaritySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Rarity
+        fields = ['id', 'name', 'color_code']
+
+
+class ItemTypeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ItemType
+        fields = ['id', 'name']
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    rarity = RaritySerializer(read_only=True)
+    type = ItemTypeSerializer(read_only=True)
+
+    class Meta:
+        model = Item
+        fields = ['id', 'name', 'description', 'rarity', 'type', 'value', 'craftable']
+
+
+class MissionTypeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MissionType
+        fields = ['id', 'name']
+
+
+class MissionStepSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MissionStep
+        fields = ['id', 'order', 'description']
+
+
+class MissionSerializer(serializers.ModelSerializer):
+    type = MissionTypeSerializer(read_only=True)
+    reward_item = ItemSerializer(read_only=True)
+    steps = MissionStepSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Mission
+        fields = ['id', 'name', 'description', 'type', 'reward_gold', 'reward_xp', 'reward_item', 'steps']
+
+
+class CharacterStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CharacterStats
+        fields = ['health', 'attack', 'defense', 'dexterity', 'intelligence', 'observation']
+
+
+class InventoryItemSerializer(serializers.ModelSerializer):
+    item = ItemSerializer(read_only=True)
+
+    class Meta:
+        model = InventoryItem
+        fields = ['item', 'quantity']
+
+
+class ZoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Zone
+        fields = ['id', 'name', 'is_safe_zone']
+
+
+class CharacterLocationSerializer(serializers.ModelSerializer):
+    zone = ZoneSerializer(read_only=True)
+
+    class Meta:
+        model = CharacterLocation
+        fields = ['zone', 'last_moved']
+
+
+class ActiveMissionSerializer(serializers.ModelSerializer):
+    mission_id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(source='mission.name', read_only=True)
+    next_step = MissionStepSerializer(read_only=True)
+
+    class Meta:
+        model = CharacterMission
+        fields = ['id', 'mission_id', 'name', 'next_step']
+
+
+class CharacterSerializer(serializers.ModelSerializer):
+    stats = serializers.SerializerMethodField()
+    location = serializers.SerializerMethodField()
+    inventory = InventoryItemSerializer(many=True, read_only=True)
+    active_missions = ActiveMissionSerializer(many=True, read_only=True)
+    energy = serializers.IntegerField(source='current_energy', read_only=True)
+
+    class Meta:
+        model = Character
+        fields = [
+            'id', 'name', 'title', 'bio', 'level', 'xp', 'energy', 'gold', 'is_npc',
+            'stats', 'location', 'inventory', 'active_missions',
+        ]
+
+    # The reverse one-to-ones may be missing; the view select_related()s them,
+    # so checking for them costs nothing.
+    def get_stats(self, character):
+        stats = getattr(character, 'stats', None)
+        return CharacterStatsSerializer(stats).data if stats else None
+
+    def get_location(self, character):
+        location = getattr(character, 'location', None)
+        return CharacterLocationSerializer(location).data if location else None
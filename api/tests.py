@@ -1,3 +1,171 @@
+from datetime import timedelta
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from core.inventory import grant_item
+from core.models import (
+    Character, CharacterLocation, CharacterMission, CharacterMissionProgress, CharacterStats, EventLog,
+    InventoryItem, Item, ItemType, Mission, MissionStep, MissionType, Rarity, Zone,
+)
+
+
+class CharacterFeedTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="veteran")
+        self.character = Character.objects.create(user=self.user, name="Veteran")
+        start = now() - timedelta(days=1)
+        EventLog.objects.bulk_create([
+            EventLog(character=self.character, message=f"event {i}", timestamp=start + timedelta(seconds=i))
+            for i in range(25)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_feed_pages_backwards_with_cursor(self):
+        url = f"/api/characters/{self.character.pk}/feed/?page_size=10"
+        messages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            messages += [event["message"] for event in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(messages, [f"event {i}" for i in reversed(range(25))])
+
+    def test_feed_continues_into_the_archive(self):
+        old = now() - timedelta(days=200)
+        EventLog.objects.bulk_create([
+            EventLog(character=self.character, message=f"old {i}", timestamp=old + timedelta(days=i * 20))
+            for i in range(3)
+        ])
+        call_command("archive_events", days=90, stdout=StringIO())
+
+        url = f"/api/characters/{self.character.pk}/feed/?page_size=10"
+        messages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            for entry in response.data["results"]:
+                messages += [event["message"] for event in entry.get("events", [entry])]
+            url = response.data["next"]
+        self.assertEqual(messages, [f"event {i}" for i in reversed(range(25))] + [f"old {i}" for i in reversed(range(3))])
+
+    def test_feed_is_private(self):
+        other = Character.objects.create(user=User.objects.create_user(username="other"), name="Other")
+        response = self.client.get(f"/api/characters/{other.pk}/feed/")
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f"/api/characters/{other.pk}/feed/archive/")
+        self.assertEqual(response.status_code, 404)
+
+
+class GameApiQueryCountTest(TestCase):
+    """Each list endpoint costs a fixed number of queries, however many rows it returns."""
+
+    def setUp(self):
+        self.rarity = Rarity.objects.create(name="Common", color_code="#FFFFFF")
+        self.item_type = ItemType.objects.create(name="Relic")
+        self.mission_type = MissionType.objects.create(name="Main")
+        self.zone = Zone.objects.create(name="Ashen Gate", description="")
+        self.admin = User.objects.create_user(username="admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def seed(self, count):
+        for i in range(count):
+            item = Item.objects.create(name=f"Item {i}", rarity=self.rarity, type=self.item_type)
+            mission = Mission.objects.create(name=f"Mission {i}", description="", type=self.mission_type, reward_item=item)
+            for order in (1, 2):
+                MissionStep.objects.create(mission=mission, order=order, description=f"step {order}")
+            character = Character.objects.create(name=f"Hero {i}")
+            CharacterStats.objects.create(character=character)
+            CharacterLocation.objects.create(character=character, zone=self.zone)
+            InventoryItem.objects.create(character=character, item=item, quantity=2)
+            cm = CharacterMission.objects.create(character=character, mission=mission)
+            for step in mission.steps.all():
+                CharacterMissionProgress.objects.create(character_mission=cm, step=step)
+
+    def assertFixedQueries(self, url, num):
+        for count in (1, 9):
+            self.seed(count)
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data["results"])
+
+    def test_characters(self):
+        # count, characters + stats + location + zone, inventory, active missions
+        self.assertFixedQueries("/api/characters/", 4)
+
+    def test_missions(self):
+        # count, missions + type + reward item, steps
+        self.assertFixedQueries("/api/missions/", 3)
+
+    def test_items(self):
+        self.assertFixedQueries("/api/items/", 2)
+
+    def test_character_sheet(self):
+        self.seed(1)
+        character = Character.objects.get()
+        response = self.client.get(f"/api/characters/{character.pk}/")
+        self.assertEqual(response.data["stats"]["health"], 100)
+        self.assertEqual(response.data["location"]["zone"]["name"], "Ashen Gate")
+        self.assertEqual(response.data["inventory"][0]["item"]["rarity"]["name"], "Common")
+        self.assertEqual(response.data["active_missions"][0]["next_step"]["order"], 1)
+
+    def test_players_only_see_their_own_characters(self):
+        self.seed(2)
+        user = User.objects.create_user(username="player")
+        Character.objects.filter(name="Hero 0").update(user=user)
+        self.client.force_authenticate(user)
+        response = self.client.get("/api/characters/")
+        self.assertEqual([c["name"] for c in response.data["results"]], ["Hero 0"])
+
+
+class CharacterSnapshotTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="veteran")
+        self.character = Character.objects.create(user=self.user, name="Veteran")
+        CharacterStats.objects.create(character=self.character)
+        self.item = Item.objects.create(name="Shard")
+        self.url = f"/api/characters/{self.character.pk}/snapshot/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_not_modified_skips_the_payload(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_payload_is_cached_per_version(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertEqual(first.data, second.data)
+
+    def test_model_writes_change_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.character.stats.health = 50
+        self.character.stats.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["stats"]["health"], 50)
+
+    def test_service_writes_change_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        grant_item(self.character, self.item, 3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["inventory"][0]["quantity"], 3)
 
-# Create your tests here.
+    def test_snapshot_is_private(self):
+        other = Character.objects.create(user=User.objects.create_user(username="other"), name="Other")
+        response = self.client.get(f"/api/characters/{other.pk}/snapshot/")
+        self.assertEqual(response.status_code, 404)
@@ -6,10 +6,19 @@ from api import views
 router = routers.DefaultRouter()
 router.register(r'users', views.UserViewSet)
 router.register(r'groups', views.GroupViewSet)
+router.register(r'characters', views.CharacterViewSet, basename='character')
+router.register(r'missions', views.MissionViewSet)
+router.register(r'items', views.ItemViewSet)
 
 # Wire up our API using automatic URL routing.
 # Additionally, we include login URLs for the browsable API.
 urlpatterns = [
     path('', include(router.urls)),
+    path('characters/<int:character_id>/feed/', views.CharacterFeedView.as_view(), name='character-feed'),
+    path(
+        'characters/<int:character_id>/feed/archive/',
+        views.CharacterFeedArchiveView.as_view(),
+        name='character-feed-archive',
+    ),
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework'))
 ]
\ No newline at end of file
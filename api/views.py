@@ -1,7 +1,20 @@
 from django.contrib.auth.models import Group, User
-from rest_framework import permissions, viewsets
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
+from rest_framework import generics, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
-from api.serializers import GroupSerializer, UserSerializer
+from api.serializers import (
+    CharacterSerializer, EventLogArchiveSerializer, EventLogSerializer, GroupSerializer, ItemSerializer,
+    MissionSerializer, UserSerializer,
+)
+from core import snapshots
+from core.models import Character, CharacterMission, EventLog, EventLogArchive, InventoryItem, Item, Mission
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -19,4 +32,148 @@ class GroupViewSet(viewsets.ModelViewSet):
     """
     queryset = Group.objects.all().order_by('name')
     serializer_class = GroupSerializer
-    permission_classes = [permissions.IsAuthenticated]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class CharacterViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for character sheets: stats, inventory, location and active missions.
+    Players see their own characters, staff see everyone.
+    """
+    serializer_class = CharacterSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        return self.visible_characters(
+            Character.objects
+            .select_related('stats', 'location__zone')
+            .prefetch_related(
+                Prefetch(
+                    'inventory',
+                    queryset=InventoryItem.objects.filter(quantity__gt=0)
+                    .select_related('item__rarity', 'item__type').order_by('item__name'),
+                ),
+                Prefetch(
+                    'charactermission_set',
+                    queryset=CharacterMission.objects.filter(completed=False)
+                    .select_related('mission', 'next_step').order_by('pk'),
+                    to_attr='active_missions',
+                ),
+            )
+            .order_by('pk')
+        )
+
+    def visible_characters(self, characters):
+        if not self.request.user.is_staff:
+            characters = characters.filter(user=self.request.user)
+        return characters
+
+    @action(detail=True)
+    def snapshot(self, request, pk=None):
+        """
+        The character sheet behind a strong ETag derived from the character's
+        snapshot version. A matching If-None-Match costs one permission check
+        and no serialization; otherwise the payload is served from the cache
+        while the version is unchanged.
+        """
+        character = self.visible_characters(Character.objects.only('energy', 'energy_updated_at')).filter(pk=pk).first()
+        if character is None:
+            raise Http404
+        # Energy regenerates without writes, so it is part of the version.
+        version = f'{snapshots.get_version(pk)}.{character.current_energy}'
+        etag = snapshots.etag(pk, version)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        payload = snapshots.get_payload(pk, version)
+        if payload is None:
+            payload = self.get_serializer(self.get_object()).data
+            snapshots.set_payload(pk, version, payload)
+        return Response(payload, headers={'ETag': etag})
+
+
+class MissionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that lists missions with their steps and rewards.
+    """
+    queryset = (
+        Mission.objects
+        .select_related('type', 'reward_item__rarity', 'reward_item__type')
+        .prefetch_related('steps')
+        .order_by('pk')
+    )
+    serializer_class = MissionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class ItemViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that lists items with their rarity and type.
+    """
+    queryset = Item.objects.select_related('rarity', 'type').order_by('pk')
+    serializer_class = ItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class EventFeedPagination(CursorPagination):
+    # Keyset pagination over the (character, -timestamp, -id) index: every page
+    # is an index range scan, no matter how far back the client scrolls.
+    ordering = ('-timestamp', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class EventArchivePagination(CursorPagination):
+    # Keyset pagination over the (character, -period_end) index
+    ordering = ('-period_end', '-id')
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 20
+
+
+class CharacterEventsMixin:
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_character(self):
+        characters = Character.objects.all()
+        if not self.request.user.is_staff:
+            characters = characters.filter(user=self.request.user)
+        return get_object_or_404(characters, pk=self.kwargs['character_id'])
+
+
+class CharacterFeedView(CharacterEventsMixin, generics.ListAPIView):
+    """
+    API endpoint that pages backwards through a character's event log.
+
+    Events moved out by archive_events continue on the archive endpoint: the
+    last page of the live log links to it as ``next``.
+    """
+    serializer_class = EventLogSerializer
+    pagination_class = EventFeedPagination
+
+    def get_queryset(self):
+        self.character = self.get_character()
+        return EventLog.objects.filter(character=self.character)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if response.data['next'] is None and EventLogArchive.objects.filter(character=self.character).exists():
+            response.data['next'] = reverse(
+                'character-feed-archive', kwargs={'character_id': self.character.pk}, request=self.request
+            )
+        return response
+
+
+class CharacterFeedArchiveView(CharacterEventsMixin, generics.ListAPIView):
+    """
+    API endpoint that pages backwards through a character's archived events,
+    a month (or archive_events chunk) at a time.
+    """
+    serializer_class = EventLogArchiveSerializer
+    pagination_class = EventArchivePagination
+
+    def get_queryset(self):
+        return EventLogArchive.objects.filter(character=self.get_character())
@@ -5,8 +5,8 @@ from .models import (
     MissionType, Mission, MissionStep, CharacterMission, CharacterMissionProgress,
     Auction, AuctionReputation,
     Friendship, CharacterReputation,
-    Zone, CharacterLocation,
-    EventLog, TextCommand
+    Zone, CharacterLocation, CommandAlias, CommandHistory,
+    EventLog, EventLogArchive, TextCommand
 )
 
 class CharacterStatsInline(admin.StackedInline):
@@ -20,7 +20,7 @@ class InventoryItemInline(admin.TabularInline):
 @admin.register(Character)
 class CharacterAdmin(admin.ModelAdmin):
     inlines = [CharacterStatsInline, InventoryItemInline]
-    list_display = ['name', 'is_npc', 'level', 'xp', 'energy', 'gold']
+    list_display = ['name', 'is_npc', 'level', 'xp', 'current_energy', 'gold']
     list_filter = ['is_npc']
     search_fields = ['name', 'user__username']
 
@@ -28,6 +28,7 @@ class CharacterAdmin(admin.ModelAdmin):
 class ItemAdmin(admin.ModelAdmin):
     list_display = ['name', 'type', 'rarity', 'value', 'craftable']
     list_filter = ['type', 'rarity']
+    list_select_related = ['type', 'rarity']
 
 @admin.register(RuinItemDrop)
 class RuinItemDropAdmin(admin.ModelAdmin):
@@ -40,12 +41,37 @@ class MissionAdmin(admin.ModelAdmin):
     list_display = ['name', 'type', 'reward_gold', 'reward_xp']
     search_fields = ['name']
     list_filter = ['type']
+    list_select_related = ['type']
+
+@admin.register(Auction)
+class AuctionAdmin(admin.ModelAdmin):
+    list_display = ['item', 'seller', 'quantity', 'price', 'status', 'buyer', 'created_at']
+    list_filter = ['status']
+    list_select_related = ['item', 'seller', 'buyer']
+    raw_id_fields = ['seller', 'buyer']
 
 @admin.register(EventLog)
 class EventLogAdmin(admin.ModelAdmin):
     list_display = ['character', 'message', 'timestamp']
     search_fields = ['character__name', 'message']
     list_filter = ['timestamp']
+    list_select_related = ['character']
+    ordering = ['-timestamp']
+    show_full_result_count = False
+
+@admin.register(CommandHistory)
+class CommandHistoryAdmin(admin.ModelAdmin):
+    list_display = ['character', 'command', 'created_at']
+    list_select_related = ['character']
+    raw_id_fields = ['character']
+    ordering = ['character', '-sequence']
+
+@admin.register(EventLogArchive)
+class EventLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ['character', 'period_start', 'period_end', 'count']
+    list_select_related = ['character']
+    raw_id_fields = ['character']
+    show_full_result_count = False
 
 admin.site.register(CharacterStats)
 admin.site.register(Rarity)
@@ -58,11 +84,11 @@ admin.site.register(Component)
 admin.site.register(MissionStep)
 admin.site.register(CharacterMission)
 admin.site.register(CharacterMissionProgress)
-admin.site.register(Auction)
 admin.site.register(AuctionReputation)
 admin.site.register(Friendship)
 admin.site.register(CharacterReputation)
 admin.site.register(Zone)
 admin.site.register(CharacterLocation)
 admin.site.register(TextCommand)
+admin.site.register(CommandAlias)
 admin.site.register(MissionType)
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Benchmark harness for the hot game flows.
+
+seed() builds a deterministic world, run() measures every operation in
+OPERATIONS against it inside a rolled back transaction, and compare()
+checks the results against a stored baseline: query counts must not grow
+at all, wall time and allocations may grow by a tolerance before they
+count as a regression. Used by the ``benchmark`` management command and
+by core.test_benchmark.
+"""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import catalog
+from .history import run_command
+from .models import (
+    Character, CharacterLocation, CharacterMission, CharacterMissionProgress, CharacterStats, EventLog, Item,
+    ItemType, Mission, MissionStep, MissionType, Rarity, Ruin, RuinItemDrop, Zone,
+)
+from .parser import get_parser
+from .utils import get_random_loot_for_ruin
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+DEFAULT_PARAMS = {"characters": 25, "missions": 5, "steps": 4, "drops": 8, "events": 10, "repeat": 10, "seed": 0}
+
+# Wall time and allocations may grow by this fraction of the baseline (plus
+# a small absolute allowance for very cheap operations) before failing.
+TIME_TOLERANCE = 1.0
+TIME_ALLOWANCE_MS = 2.0
+ALLOC_TOLERANCE = 0.5
+ALLOC_ALLOWANCE_KB = 16.0
+
+
+def seed(characters, missions, steps, drops, events, seed=0, **params):
+    """Create a world of ``characters`` each on every one of ``missions`` missions of ``steps`` steps."""
+    rng = random.Random(seed)
+    rarity = Rarity.objects.create(name="Bench Common", color_code="#FFFFFF")
+    item_type = ItemType.objects.create(name="Bench Relic")
+    mission_type = MissionType.objects.create(name="Bench Main")
+    zone = Zone.objects.create(name="Bench Plaza", description="", fallback_message="Nothing stirs.")
+
+    ruin = Ruin.objects.create(name="Bench Ruin", description="", unlocked=True)
+    items = Item.objects.bulk_create([
+        Item(name=f"Bench Item {i}", rarity=rarity, type=item_type, value=i) for i in range(drops)
+    ])
+    RuinItemDrop.objects.bulk_create([
+        RuinItemDrop(ruin=ruin, item=item, drop_chance=round(rng.uniform(0.05, 0.9), 2)) for item in items
+    ])
+
+    mission_rows = Mission.objects.bulk_create([
+        Mission(name=f"Bench Mission {m}", description="", type=mission_type, reward_gold=10, reward_xp=10)
+        for m in range(missions)
+    ])
+    step_rows = MissionStep.objects.bulk_create([
+        MissionStep(
+            mission=mission, order=order, description=f"search mission {m} step {order}",
+            normalized_description=f"search mission {m} step {order}", success_response="Done.",
+        )
+        for m, mission in enumerate(mission_rows) for order in range(1, steps + 1)
+    ])
+
+    character_rows = Character.objects.bulk_create([Character(name=f"Bench Hero {c}") for c in range(characters)])
+    CharacterStats.objects.bulk_create([CharacterStats(character=character) for character in character_rows])
+    CharacterLocation.objects.bulk_create([CharacterLocation(character=character, zone=zone) for character in character_rows])
+    character_missions = CharacterMission.objects.bulk_create([
+        CharacterMission(character=character, mission=mission) for character in character_rows for mission in mission_rows
+    ])
+    CharacterMissionProgress.objects.bulk_create([
+        CharacterMissionProgress(character_mission=cm, step=step)
+        for cm in character_missions for step in step_rows if step.mission_id == cm.mission_id
+    ])
+    for cm in character_missions:
+        cm.refresh_next_step()
+    EventLog.objects.bulk_create([
+        EventLog(character=character, message=f"Bench event {e}") for character in character_rows for e in range(events)
+    ])
+
+    return {
+        "characters": character_rows,
+        "missions": mission_rows,
+        "ruin": ruin,
+        "admin": User.objects.create_superuser("bench-admin", "bench@example.com", "bench"),
+    }
+
+
+def _text_command_match(world, i):
+    character = world["characters"][i]
+    return lambda: run_command(character, "Search mission 0 step 1")
+
+
+def _text_command_miss(world, i):
+    character = world["characters"][i]
+    return lambda: run_command(character, "dance wildly")
+
+
+def _complete_step(world, i):
+    cm = CharacterMission.objects.select_related("character", "mission", "next_step").get(
+        character=world["characters"][i], mission=world["missions"][-1]
+    )
+    return lambda: cm.complete_step(cm.next_step)
+
+
+def legacy_complete_step(cm, step):
+    """
+    complete_step() as it was before it became one atomic operation: read the
+    progress, update it, log each event on its own and re-check the mission.
+    Measured as mission.complete_step.legacy, the reference the current
+    implementation is compared against.
+    """
+    progress = cm.progress.filter(step=step).first()
+    if progress and not progress.completed:
+        CharacterMissionProgress.objects.filter(pk=progress.pk).update(completed=True)
+        EventLog.log(cm.character, f"{cm.character.name} completed the step '{step.description}' in mission '{cm.mission.name}'")
+        if step.success_response:
+            EventLog.log(cm.character, step.success_response)
+        if not cm.progress.filter(completed=False).exists():
+            cm.completed = True
+            cm.save()
+            EventLog.log(cm.character, f"{cm.character.name} completed the mission '{cm.mission.name}' 🎉")
+
+
+def _legacy_complete_step(world, i):
+    cm = CharacterMission.objects.select_related("character", "mission").get(
+        character=world["characters"][i], mission=world["missions"][-1]
+    )
+    step = cm.current_step().step
+    return lambda: legacy_complete_step(cm, step)
+
+
+def _loot(world, i):
+    return lambda: get_random_loot_for_ruin(world["ruin"])
+
+
+def _parse_typo(world, i):
+    return lambda: get_parser().candidates("serch mision 0 stpe 1")
+
+
+def _admin_page(url):
+    def prepare(world, i):
+        client = Client()
+        client.force_login(world["admin"])
+        return lambda: client.get(url)
+    return prepare
+
+
+# name -> prepare(world, i), returning the call to measure. Every call gets
+# its own index, so calls that consume state (a mission step) never share it.
+OPERATIONS = {
+    "text_command.match": _text_command_match,
+    "text_command.miss": _text_command_miss,
+    "mission.complete_step": _complete_step,
+    "mission.complete_step.legacy": _legacy_complete_step,
+    "loot.random_for_ruin": _loot,
+    "parser.typo": _parse_typo,
+    "admin.character_list": _admin_page("/admin/core/character/"),
+    "admin.item_list": _admin_page("/admin/core/item/"),
+    "admin.mission_list": _admin_page("/admin/core/mission/"),
+    "admin.eventlog_list": _admin_page("/admin/core/eventlog/"),
+    "admin.auction_list": _admin_page("/admin/core/auction/"),
+}
+
+
+def measure(prepare, world, repeat):
+    """
+    Run the operation once to warm caches, then ``repeat`` times counting
+    queries and wall time, then ``repeat`` more times under tracemalloc (so
+    its overhead stays out of the timings).
+    """
+    calls = [prepare(world, i) for i in range(1 + 2 * repeat)]
+    calls[0]()
+
+    queries, times = [], []
+    for call in calls[1:repeat + 1]:
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call()
+            times.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+
+    peaks = []
+    for call in calls[repeat + 1:]:
+        tracemalloc.start()
+        try:
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "queries": max(queries),
+        "time_ms": round(statistics.median(times), 3),
+        "alloc_kb": round(max(peaks), 1),
+    }
+
+
+def run(only=None, **params):
+    """Seed a world and measure every operation (or those named in ``only``). Nothing is left in the database."""
+    params = {**DEFAULT_PARAMS, **params}
+    if params["characters"] < 1 + 2 * params["repeat"]:
+        raise ValueError("Need at least 1 + 2 * repeat characters, one per measured call")
+
+    random.seed(params["seed"])
+    results = {}
+    try:
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+            world = seed(**params)
+            # bulk_create() sends no signals, so the catalog has to be told
+            catalog.invalidate()
+            for name, prepare in OPERATIONS.items():
+                if only is None or name in only:
+                    results[name] = measure(prepare, world, params["repeat"])
+            transaction.set_rollback(True)
+    finally:
+        catalog.invalidate()
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    """The stored baseline for the current database vendor, or None."""
+    try:
+        with open(path) as f:
+            return json.load(f).get(connection.vendor)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results, params, path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+    baselines[connection.vendor] = {"params": {**DEFAULT_PARAMS, **params}, "results": results}
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, alloc_tolerance=ALLOC_TOLERANCE, check_time=True):
+    """Return a list of human readable regressions of ``results`` against ``baseline["results"]``."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: {result['queries']} queries, baseline {before['queries']}")
+        if check_time:
+            if result["time_ms"] > before["time_ms"] * (1 + time_tolerance) + TIME_ALLOWANCE_MS:
+                regressions.append(f"{name}: {result['time_ms']:.2f} ms, baseline {before['time_ms']:.2f} ms")
+            if result["alloc_kb"] > before["alloc_kb"] * (1 + alloc_tolerance) + ALLOC_ALLOWANCE_KB:
+                regressions.append(f"{name}: {result['alloc_kb']:.1f} KiB allocated, baseline {before['alloc_kb']:.1f} KiB")
+    return regressions
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import (
+    CommandAlias, Item, ItemType, MissionStep, MissionType, Rarity, Recipe, RecipeIngredient, RuinItemDrop, Zone,
+)
+
+# Models whose rows are loaded into the catalog or into structures derived
+# from it (loot tables, the command parser). Saving or deleting any of them
+# invalidates it (see core.signals).
+CATALOG_MODELS = (
+    Rarity, ItemType, MissionType, Zone, Item, RuinItemDrop, Recipe, RecipeIngredient, MissionStep, CommandAlias,
+)
+
+VERSION_KEY = "core:catalog:version"
+# How often a worker checks the shared version counter for changes made by
+# other workers. Changes made by this worker are picked up immediately.
+VERSION_CHECK_SECONDS = 1.0
+
+_local = {"catalog": None, "checked_at": 0.0}
+# The catalog a thread's open transaction sees after changing catalog rows.
+# It is never shared: the changes may still roll back.
+_transaction = threading.local()
+
+
+class Catalog:
+    """In-memory snapshot of the static game content tables."""
+
+    def __init__(self, version):
+        self.version = version
+        self.rarities = {rarity.pk: rarity for rarity in Rarity.objects.all()}
+        self.item_types = {item_type.pk: item_type for item_type in ItemType.objects.all()}
+        self.mission_types = {mission_type.pk: mission_type for mission_type in MissionType.objects.all()}
+        self.zones = {zone.pk: zone for zone in Zone.objects.all()}
+
+        self.items = {}
+        for item in Item.objects.all():
+            item.rarity = self.rarities.get(item.rarity_id)
+            item.type = self.item_types.get(item.type_id)
+            self.items[item.pk] = item
+
+        self.drops_by_ruin = defaultdict(list)
+        for drop in RuinItemDrop.objects.order_by("pk"):
+            drop.item = self.items[drop.item_id]
+            self.drops_by_ruin[drop.ruin_id].append(drop)
+
+        self.recipes = {recipe.pk: recipe for recipe in Recipe.objects.all()}
+        self.ingredients_by_recipe = defaultdict(list)
+        for ingredient in RecipeIngredient.objects.order_by("pk"):
+            ingredient.item = self.items[ingredient.item_id]
+            self.ingredients_by_recipe[ingredient.recipe_id].append(ingredient)
+        for recipe in self.recipes.values():
+            recipe.result = self.items[recipe.result_id]
+
+        # Derived structures (e.g. loot tables) cached for the life of this version
+        self.derived = {}
+
+
+def _shared_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a cache eviction never hands out a version
+        # some worker has already loaded.
+        cache.add(VERSION_KEY, time.time_ns())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _last_pending_invalidation():
+    # The latest invalidation this thread's transaction will publish on
+    # commit, as its on_commit entry. Django drops the entries on rollback,
+    # and a savepoint's own (always the latest ones) on a rollback to it.
+    pending = None
+    for entry in transaction.get_connection().run_on_commit:
+        if entry[1] is _bump_version:
+            pending = entry
+    return pending
+
+
+def get_catalog():
+    pending = _last_pending_invalidation()
+    if pending is not None:
+        catalog = getattr(_transaction, "catalog", None)
+        if catalog is None or _transaction.pending is not pending:
+            catalog = _transaction.catalog = Catalog(_shared_version())
+            _transaction.pending = pending
+        return catalog
+    _transaction.catalog = _transaction.pending = None
+
+    catalog = _local["catalog"]
+    if catalog is None or time.monotonic() - _local["checked_at"] >= VERSION_CHECK_SECONDS:
+        version = _shared_version()
+        if catalog is None or catalog.version != version:
+            catalog = _local["catalog"] = Catalog(version)
+        _local["checked_at"] = time.monotonic()
+    return catalog
+
+
+def invalidate():
+    """
+    Drop this worker's catalog now and bump the shared version once the
+    transaction commits. Until then the transaction gets a catalog of its own
+    (see get_catalog()), so one built from rows that roll back is never kept.
+    """
+    _local["catalog"] = None
+    transaction.on_commit(_bump_version)
+
+
+def _bump_version():
+    _local["catalog"] = None
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns())
+
+
+def get_rarity(pk):
+    return get_catalog().rarities.get(pk)
+
+
+def get_item_type(pk):
+    return get_catalog().item_types.get(pk)
+
+
+def get_mission_type(pk):
+    return get_catalog().mission_types.get(pk)
+
+
+def get_zone(pk):
+    return get_catalog().zones.get(pk)
+
+
+def get_item(pk):
+    return get_catalog().items.get(pk)
+
+
+def get_items(pks):
+    items = get_catalog().items
+    return {pk: items[pk] for pk in pks if pk in items}
+
+
+def get_ruin_drops(ruin_id):
+    return get_catalog().drops_by_ruin.get(ruin_id, [])
+
+
+def get_recipe(pk):
+    return get_catalog().recipes.get(pk)
+
+
+def get_recipe_ingredients(recipe_id):
+    return get_catalog().ingredients_by_recipe.get(recipe_id, [])
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Cache backends whose entries other processes cannot see
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def shared_state_errors(workers):
+    """
+    Errors for state that lives inside one process while ``workers`` worker
+    processes serve requests. Also run by gunicorn.conf.py before a worker
+    serves, with the worker count gunicorn actually uses.
+    """
+    if workers <= 1:
+        return []
+    errors = []
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        errors.append(Error(
+            f"The default cache is local to each process but {workers} workers are configured.",
+            hint=(
+                "Snapshot versions (and so ETags), the catalog version, presence and the leaderboard would "
+                "go stale in every worker but the one that made a change. Set REDIS_URL, or run one worker."
+            ),
+            id="core.E002",
+        ))
+    if settings.COMMAND_RATE_LIMIT_BACKEND == "core.ratelimit.LocalBackend":
+        errors.append(Error(
+            f"COMMAND_RATE_LIMIT_BACKEND is the per-process LocalBackend but {workers} workers are configured.",
+            hint="Each worker would allow the full limit. Set REDIS_URL (or use core.ratelimit.CacheBackend), or run one worker.",
+            id="core.E003",
+        ))
+    if settings.PUBSUB_BROKER == "core.pubsub.LocalBroker":
+        errors.append(Error(
+            f"PUBSUB_BROKER is the in-process LocalBroker but {workers} workers are configured.",
+            hint="Event stream clients would miss events published by other workers. Set REDIS_URL, or run one worker.",
+            id="core.E001",
+        ))
+    return errors
+
+
+@register()
+def shared_state_check(app_configs, **kwargs):
+    return shared_state_errors(settings.WEB_CONCURRENCY)
@@ -0,0 +1,94 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from . import snapshots
+from .catalog import get_recipe_ingredients
+from .inventory import grant_items
+from .models import InventoryItem
+
+
+class CraftingError(Exception):
+    pass
+
+
+def craft(character, recipe, times=1):
+    """Craft ``recipe`` ``times`` times. Raises CraftingError if any ingredient is short."""
+    return craft_batch(character, [(recipe, times)])
+
+
+def craft_max(character, recipe):
+    """Craft ``recipe`` as many times as the inventory allows. Returns how many were crafted."""
+    character_id = getattr(character, "pk", character)
+    needs = _ingredients([(recipe, 1)])
+    if not needs:
+        raise CraftingError(f"Recipe '{recipe.name}' has no ingredients")
+
+    with transaction.atomic():
+        have = _stock(character_id, needs)
+        times = min(have.get(item_id, 0) // quantity for item_id, quantity in needs.items())
+        if times:
+            _consume(character_id, Counter({item_id: quantity * times for item_id, quantity in needs.items()}))
+            grant_items({(character_id, recipe.result_id): times})
+    return times
+
+
+def craft_batch(character, orders):
+    """
+    Craft several recipes in one transaction.
+
+    ``orders`` is an iterable of ``(recipe, times)``. Either every order is
+    crafted or, if any ingredient is short, nothing is. Returns a Counter of
+    result item id -> quantity crafted.
+    """
+    character_id = getattr(character, "pk", character)
+    orders = [(recipe, times) for recipe, times in orders if times > 0]
+    needs = _ingredients(orders)
+    results = Counter()
+    for recipe, times in orders:
+        results[recipe.result_id] += times
+
+    with transaction.atomic():
+        have = _stock(character_id, needs)
+        missing = {item_id: quantity - have.get(item_id, 0) for item_id, quantity in needs.items() if have.get(item_id, 0) < quantity}
+        if missing:
+            raise CraftingError(f"Missing ingredients: {missing}")
+        _consume(character_id, needs)
+        grant_items({(character_id, item_id): quantity for item_id, quantity in results.items()})
+    return results
+
+
+def _ingredients(orders):
+    needs = Counter()
+    for recipe, times in orders:
+        for ingredient in get_recipe_ingredients(recipe.pk):
+            needs[ingredient.item_id] += ingredient.quantity * times
+    return needs
+
+
+def _stock(character_id, needs):
+    """Current quantity of every needed item, in one query over the unique stacks."""
+    return dict(
+        InventoryItem.objects
+        .filter(character_id=character_id, item_id__in=needs)
+        .values_list("item_id", "quantity")
+    )
+
+
+def _consume(character_id, needs):
+    """
+    Subtract every ingredient in one UPDATE that only touches rows with
+    enough quantity. If fewer rows change than there are ingredients, some
+    stack was spent concurrently and the whole transaction is rolled back.
+    """
+    if not needs:
+        return
+    amount = Case(*[When(item_id=item_id, then=Value(quantity)) for item_id, quantity in needs.items()])
+    updated = InventoryItem.objects.filter(
+        character_id=character_id, item_id__in=needs, quantity__gte=amount
+    ).update(quantity=F("quantity") - amount)
+    if updated != len(needs):
+        raise CraftingError("Ingredients changed while crafting")
+    snapshots.touch(character_id)
+    InventoryItem.objects.filter(character_id=character_id, item_id__in=needs, quantity=0).delete()
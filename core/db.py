@@ -0,0 +1,69 @@
+from django.db import connection
+from django.db.models import BigIntegerField, Func
+
+
+class EpochSeconds(Func):
+    """Whole seconds since the Unix epoch of a datetime expression, rounded down."""
+    arity = 1
+    output_field = BigIntegerField()
+    template = "CAST(FLOOR(EXTRACT(EPOCH FROM %(expressions)s)) AS bigint)"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # The strftime format goes in as a parameter: a literal %s in the SQL
+        # would be taken for a placeholder.
+        sql, params = self.as_sql(
+            compiler, connection, template="CAST(strftime(%%s, %(expressions)s) AS integer)", **extra_context
+        )
+        return sql, ("%s", *params)
+
+
+def insert_or_add(model, conflict_fields, add_fields, rows, bounds=None, replace_fields=(), batch_size=500):
+    """
+    Insert ``rows`` and, for rows that hit the unique ``conflict_fields``, add
+    the inserted ``add_fields`` values to the stored ones.
+
+    Django's bulk_create(update_conflicts=True) can only overwrite a column
+    with the EXCLUDED value, so the additive upsert is written by hand:
+
+        INSERT ... ON CONFLICT (conflict_fields)
+        DO UPDATE SET add_field = table.add_field + EXCLUDED.add_field
+
+    ``add_fields`` is a field name or a sequence of them, and ``rows`` are
+    tuples ordered as ``conflict_fields + add_fields + replace_fields``.
+    ``replace_fields`` are simply overwritten on conflict. With
+    ``bounds=(low, high)`` the added results are clamped in SQL. Works on
+    PostgreSQL and SQLite 3.24+.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if isinstance(add_fields, str):
+        add_fields = (add_fields,)
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+
+    def column(name):
+        return qn(model._meta.get_field(name).column)
+
+    conflict_columns = [column(name) for name in conflict_fields]
+    assignments = []
+    for target in map(column, add_fields):
+        total = f"{table}.{target} + EXCLUDED.{target}"
+        if bounds is not None:
+            low, high = int(bounds[0]), int(bounds[1])
+            total = f"CASE WHEN {total} < {low} THEN {low} WHEN {total} > {high} THEN {high} ELSE {total} END"
+        assignments.append(f"{target} = {total}")
+    assignments += [f"{target} = EXCLUDED.{target}" for target in map(column, replace_fields)]
+
+    columns = ", ".join(conflict_columns + [column(name) for name in (*add_fields, *replace_fields)])
+    placeholders = "(" + ", ".join(["%s"] * (len(conflict_fields) + len(add_fields) + len(replace_fields))) + ")"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {', '.join(assignments)}",
+                [value for row in batch for value in row],
+            )
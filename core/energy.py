@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils.timezone import now
+
+from . import snapshots
+from .db import EpochSeconds
+from .models import Character
+
+# Energy regenerates on a global grid of ticks ENERGY_REGEN_SECONDS long.
+# A character's stored energy is its energy at energy_updated_at, and every
+# tick boundary crossed since then is worth one point, up to ENERGY_MAX.
+# Energy above the cap (e.g. from a potion) is kept but does not regenerate.
+
+
+def _tick(at):
+    return int(at.timestamp()) // settings.ENERGY_REGEN_SECONDS
+
+
+def current_energy(character, at=None):
+    """The character's energy at ``at`` (default: now), from the loaded fields."""
+    ticks = max(_tick(at or now()) - _tick(character.energy_updated_at), 0)
+    return max(character.energy, min(settings.ENERGY_MAX, character.energy + ticks))
+
+
+def energy_expression(at):
+    """current_energy() as an SQL expression over the Character row."""
+    ticks = Value(_tick(at)) - EpochSeconds(F("energy_updated_at")) / Value(settings.ENERGY_REGEN_SECONDS)
+    return Greatest(F("energy"), Least(Value(settings.ENERGY_MAX), F("energy") + ticks))
+
+
+def spend_energy(character, amount, **conditions):
+    """
+    Take ``amount`` energy from the character if they have it.
+
+    The regeneration, the sufficiency check and the write are a single
+    conditional UPDATE, so concurrent spends can never overdraw. Extra
+    ``conditions`` (e.g. ``level__gte=5``) are checked by the same UPDATE.
+    Returns False, writing nothing, if the character is short or any
+    condition fails.
+    """
+    at = now()
+    current = energy_expression(at)
+    spent = Character.objects.filter(
+        GreaterThanOrEqual(current, amount), pk=character.pk, **conditions
+    ).update(energy=current - amount, energy_updated_at=at)
+    if not spent:
+        return False
+    snapshots.touch(character.pk)
+    # Mirror the write without reading the row back; a concurrent spend is
+    # only reflected after a refresh.
+    character.energy, character.energy_updated_at = current_energy(character, at) - amount, at
+    return True
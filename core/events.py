@@ -0,0 +1,120 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+
+from .pubsub import character_channel, get_broker
+
+_current_buffer = ContextVar("event_log_buffer", default=None)
+
+
+class EventBuffer:
+    """Collects unsaved EventLog rows and writes them with bulk_create."""
+
+    def __init__(self, max_size, max_age, depth=0):
+        self.max_size = max_size
+        self.max_age = max_age
+        # The atomic block nesting the buffer was opened at; its events are
+        # written there, so they commit or roll back with the work they log
+        self.depth = depth
+        self.events = []
+        self.started_at = None
+        self.flushed = 0
+
+    def add(self, event):
+        if not self.events:
+            self.started_at = time.monotonic()
+        self.events.append(event)
+        if len(self.events) >= self.max_size or time.monotonic() - self.started_at >= self.max_age:
+            self.flush()
+
+    def mark(self):
+        """The position of the next event added, for discard()."""
+        return self.flushed + len(self.events)
+
+    def discard(self, mark=0):
+        """
+        Drop the unwritten events added since ``mark``. Events already
+        flushed were written in the caller's transaction and are rolled back
+        with it.
+        """
+        del self.events[max(mark - self.flushed, 0):]
+
+    def flush(self):
+        if not self.events:
+            return []
+        events, self.events = self.events, []
+        self.flushed += len(events)
+        events = type(events[0]).objects.bulk_create(events)
+        publish_events(events)
+        return events
+
+
+def _atomic_depth():
+    # Blocks with savepoint=False inside a transaction commit or roll back
+    # with it, so only the outermost block and real savepoints count
+    blocks = transaction.get_connection().atomic_blocks
+    return sum(1 for i, block in enumerate(blocks) if i == 0 or block.savepoint)
+
+
+def current_buffer():
+    """
+    The open buffer, or None when there is none or a transaction or
+    savepoint has been entered since it was opened: events logged there are
+    written at once, in that transaction.
+    """
+    buffer = _current_buffer.get()
+    if buffer is not None and buffer.depth == _atomic_depth():
+        return buffer
+    return None
+
+
+@contextmanager
+def buffered_events():
+    """
+    Buffer EventLog.log() calls made inside the block and flush them on exit.
+
+    Nested blocks join the enclosing buffer when it was opened in the same
+    transaction and savepoint; a block opened inside a newer one gets its
+    own buffer, flushed before that one commits. Events from a block
+    that raises are dropped along with the rest of its work, even when an
+    outer block catches the error and carries on. With EVENT_LOG_SYNC
+    enabled nothing is buffered and every event is written immediately.
+    """
+    buffer = current_buffer()
+    if buffer is not None:
+        mark = buffer.mark()
+        try:
+            yield buffer
+        except BaseException:
+            buffer.discard(mark)
+            raise
+        return
+    if settings.EVENT_LOG_SYNC:
+        yield None
+        return
+
+    buffer = EventBuffer(settings.EVENT_LOG_BUFFER_SIZE, settings.EVENT_LOG_FLUSH_SECONDS, _atomic_depth())
+    token = _current_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _current_buffer.reset(token)
+    buffer.flush()
+
+
+def publish_events(events):
+    """Push saved events to their characters' live channels once the transaction commits."""
+    messages = [
+        (character_channel(event.character_id), {"id": event.pk, "message": event.message, "timestamp": event.timestamp.isoformat()})
+        for event in events
+    ]
+
+    def publish():
+        broker = get_broker()
+        for channel, message in messages:
+            broker.publish(channel, message)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.utils.timezone import now
+
+from . import snapshots
+from .catalog import get_items
+from .energy import current_energy, energy_expression, spend_energy
+from .events import buffered_events
+from .inventory import grant_items
+from .loot import LootTable
+from .models import Character, EventLog
+
+
+class ExplorationError(Exception):
+    pass
+
+
+def explore(character, ruin, rng=None):
+    """
+    Explore ``ruin`` once and return a Counter of item id -> quantity found.
+
+    One transaction, and at most three statements on a warm catalog: the
+    level check and the energy spend are one conditional UPDATE, the loot
+    goes to the inventory with one upsert and the events are written with
+    one bulk insert. Raises ExplorationError, writing nothing, if the ruin
+    is locked or the character is under-levelled or too tired.
+    """
+    if not ruin.unlocked:
+        raise ExplorationError(f"{ruin.name} is sealed")
+    with transaction.atomic(), buffered_events():
+        if not spend_energy(character, ruin.energy_cost, level__gte=ruin.required_level):
+            raise ExplorationError(_refusal(character, ruin))
+        found = LootTable.for_ruin(ruin).roll_each(1, rng)[0]
+        grant_items({(character.pk, item_id): quantity for item_id, quantity in found.items()})
+        EventLog.log(character, _outcome(character, ruin, found))
+    return found
+
+
+def explore_party(characters, ruin, rng=None):
+    """
+    Send several characters into ``ruin`` in one pass.
+
+    The party's rows are locked with one SELECT ... FOR UPDATE, members who
+    are under-levelled or too tired stay behind, and the rest pay their
+    energy with one UPDATE, share one loot roll batch, one inventory upsert
+    and one event insert. Returns a dict of character id -> Counter of
+    items found, for the members who went in.
+    """
+    if not ruin.unlocked:
+        raise ExplorationError(f"{ruin.name} is sealed")
+    character_ids = sorted({getattr(character, "pk", character) for character in characters})
+    at = now()
+    with transaction.atomic(), buffered_events():
+        # Locked in primary key order so overlapping parties cannot deadlock
+        party = list(
+            Character.objects.select_for_update()
+            .filter(pk__in=character_ids).order_by("pk")
+            .only("name", "level", "energy", "energy_updated_at")
+        )
+        explorers = []
+        for character in party:
+            if character.level >= ruin.required_level and current_energy(character, at) >= ruin.energy_cost:
+                explorers.append(character)
+            else:
+                EventLog.log(character, _refusal(character, ruin))
+
+        results = {}
+        if explorers:
+            # The rows are locked and checked, so the spend needs no condition
+            current = energy_expression(at)
+            Character.objects.filter(pk__in=[character.pk for character in explorers]).update(
+                energy=current - ruin.energy_cost, energy_updated_at=at
+            )
+            for character, found in zip(explorers, LootTable.for_ruin(ruin).roll_each(len(explorers), rng)):
+                results[character.pk] = found
+                EventLog.log(character, _outcome(character, ruin, found))
+            snapshots.touch(*results)
+            grant_items({
+                (character_id, item_id): quantity
+                for character_id, found in results.items()
+                for item_id, quantity in found.items()
+            })
+    return results
+
+
+def _refusal(character, ruin):
+    if character.level < ruin.required_level:
+        return f"{character.name} must reach level {ruin.required_level} to explore {ruin.name}"
+    return f"{character.name} is too tired to explore {ruin.name}"
+
+
+def _outcome(character, ruin, found):
+    if not found:
+        return f"{character.name} explored {ruin.name} but found nothing"
+    items = get_items(found)
+    loot = ", ".join(f"{quantity} x {items[item_id].name}" for item_id, quantity in sorted(found.items()))
+    return f"{character.name} explored {ruin.name} and found {loot}"
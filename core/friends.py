@@ -0,0 +1,104 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+
+from .models import Character, Friendship
+
+
+class FriendshipError(Exception):
+    pass
+
+
+def _id(character):
+    return getattr(character, "pk", character)
+
+
+def send_request(sender, recipient):
+    """
+    Ask ``recipient`` to be friends. If they already asked ``sender``, the
+    pending request is accepted instead. Returns the Friendship row.
+    """
+    sender_id, recipient_id = _id(sender), _id(recipient)
+    if sender_id == recipient_id:
+        raise FriendshipError("Characters cannot befriend themselves")
+    if Friendship.objects.filter(from_character_id=recipient_id, to_character_id=sender_id, accepted=False).update(accepted=True):
+        return Friendship.objects.get(from_character_id=recipient_id, to_character_id=sender_id)
+    try:
+        with transaction.atomic():
+            return Friendship.objects.create(from_character_id=sender_id, to_character_id=recipient_id)
+    except IntegrityError:
+        raise FriendshipError("A friendship or request between these characters already exists")
+
+
+def accept(character, requester):
+    if not Friendship.objects.filter(from_character_id=_id(requester), to_character_id=_id(character), accepted=False).update(accepted=True):
+        raise FriendshipError("No pending request")
+
+
+def remove(character, other):
+    Friendship.objects.filter(_pair(_id(character), _id(other))).delete()
+
+
+def _pair(a, b):
+    return Q(from_character_id=a, to_character_id=b) | Q(from_character_id=b, to_character_id=a)
+
+
+def are_friends(character, other):
+    return Friendship.objects.filter(_pair(_id(character), _id(other)), accepted=True).exists()
+
+
+def friend_ids(character):
+    """Ids of every accepted friend, from the two composite indexes."""
+    character_id = _id(character)
+    sent = Friendship.objects.filter(from_character_id=character_id, accepted=True).values_list("to_character_id", flat=True)
+    received = Friendship.objects.filter(to_character_id=character_id, accepted=True).values_list("from_character_id", flat=True)
+    return set(sent.union(received))
+
+
+def friends_among(character, candidates):
+    """Which of ``candidates`` (characters or ids) are friends with ``character``, in one query."""
+    character_id = _id(character)
+    candidate_ids = {_id(candidate) for candidate in candidates}
+    if not candidate_ids:
+        return set()
+    rows = Friendship.objects.filter(
+        Q(from_character_id=character_id, to_character_id__in=candidate_ids)
+        | Q(to_character_id=character_id, from_character_id__in=candidate_ids),
+        accepted=True,
+    ).values_list("from_character_id", "to_character_id")
+    return {b if a == character_id else a for a, b in rows}
+
+
+def suggestions(character, limit=10):
+    """
+    Friends of friends who are not friends yet, with their number of mutual
+    friends, most mutual first. Computed by a single recursive CTE that
+    walks the friendship graph two hops out.
+    """
+    character_id = _id(character)
+    friendship = connection.ops.quote_name(Friendship._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH RECURSIVE walk(character_id, depth) AS (
+                SELECT CAST(%s AS BIGINT), 0
+                UNION ALL
+                SELECT CASE WHEN f.from_character_id = w.character_id THEN f.to_character_id ELSE f.from_character_id END,
+                       w.depth + 1
+                FROM walk w
+                JOIN {friendship} f
+                  ON (f.from_character_id = w.character_id OR f.to_character_id = w.character_id) AND f.accepted = %s
+                WHERE w.depth < 2
+            )
+            SELECT character_id, COUNT(*) AS mutual
+            FROM walk
+            WHERE depth = 2 AND character_id <> %s
+              AND character_id NOT IN (SELECT character_id FROM walk WHERE depth = 1)
+            GROUP BY character_id
+            ORDER BY mutual DESC, character_id
+            LIMIT %s
+            """,
+            [character_id, True, character_id, limit],
+        )
+        rows = cursor.fetchall()
+    names = dict(Character.objects.filter(pk__in=[pk for pk, _ in rows]).values_list("pk", "name"))
+    return [{"character_id": pk, "name": names.get(pk), "mutual_friends": mutual} for pk, mutual in rows]
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from .events import buffered_events
+from .models import CommandHistory, TextCommand
+
+
+def run_command(character, command):
+    """
+    Process a player's command and remember it the way COMMAND_HISTORY_MODE
+    says. In "audit" mode this is TextCommand.objects.create(). In "ring"
+    mode the command goes to the character's history ring and the returned
+    TextCommand is processed but never stored.
+    """
+    if settings.COMMAND_HISTORY_MODE == "audit":
+        return TextCommand.objects.create(character=character, command=command)
+    text_command = TextCommand(character=character, command=command)
+    with transaction.atomic(savepoint=False), buffered_events():
+        text_command.created_at = record_command(character.pk, command)
+        text_command.process()
+    return text_command
+
+
+def record_command(character_id, command):
+    """
+    Write ``command`` into the character's history ring in one statement.
+
+    The next sequence number is read from the ring itself (at most
+    COMMAND_HISTORY_SIZE rows, found through the unique slot index) and the
+    row in slot ``sequence % size`` is inserted or overwritten in place.
+    Two commands racing for the same character may take the same slot, in
+    which case only one of them stays in the history. Returns the timestamp
+    recorded.
+    """
+    at = now()
+    qn = connection.ops.quote_name
+    table = qn(CommandHistory._meta.db_table)
+    character, slot, sequence, text, created_at = (
+        qn(CommandHistory._meta.get_field(name).column)
+        for name in ("character", "slot", "sequence", "command", "created_at")
+    )
+    # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({character}, {slot}, {sequence}, {text}, {created_at}) "
+            f"SELECT %s, ring.next %% %s, ring.next, %s, %s FROM ("
+            f"SELECT COALESCE(MAX({sequence}), -1) + 1 AS next FROM {table} WHERE {character} = %s"
+            f") ring WHERE true "
+            f"ON CONFLICT ({character}, {slot}) DO UPDATE SET "
+            f"{sequence} = EXCLUDED.{sequence}, {text} = EXCLUDED.{text}, {created_at} = EXCLUDED.{created_at}",
+            [character_id, settings.COMMAND_HISTORY_SIZE, command, at, character_id],
+        )
+    return at
+
+
+def get_history(character, limit=None):
+    """The character's recent commands, newest first, from whichever store the history mode writes."""
+    character_id = getattr(character, "pk", character)
+    limit = limit or settings.COMMAND_HISTORY_SIZE
+    if settings.COMMAND_HISTORY_MODE == "audit":
+        commands = TextCommand.objects.filter(character_id=character_id).order_by("-created_at", "-pk")
+    else:
+        commands = CommandHistory.objects.filter(character_id=character_id).order_by("-sequence")
+    return list(commands.values_list("command", flat=True)[:limit])
@@ -0,0 +1,31 @@
+from collections import Counter
+
+from . import snapshots
+from .db import insert_or_add
+from .models import InventoryItem
+
+
+def grant_items(grants):
+    """
+    Add item quantities to inventories.
+
+    ``grants`` maps ``(character_id, item_id)`` to the quantity to add. New
+    stacks are inserted and existing ones incremented by the same
+    INSERT ... ON CONFLICT statement, whatever the number of stacks.
+    """
+    rows = [(character_id, item_id, qty) for (character_id, item_id), qty in Counter(grants).items() if qty]
+    insert_or_add(InventoryItem, ("character", "item"), "quantity", rows)
+    snapshots.touch(*{character_id for character_id, _, _ in rows})
+
+
+def grant_item(character, item, quantity=1):
+    grant_items({(getattr(character, "pk", character), getattr(item, "pk", item)): quantity})
+
+
+def get_inventory(character):
+    """The character's inventory as a dict of item id -> quantity."""
+    return dict(
+        InventoryItem.objects
+        .filter(character_id=getattr(character, "pk", character), quantity__gt=0)
+        .values_list("item_id", "quantity")
+    )
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Rank
+
+from .models import AuctionReputation
+
+CACHE_SECONDS = 30
+TOP_KEY = "core:leaderboard:top:{n}"
+RANK_KEY = "core:leaderboard:rank:{character_id}"
+
+
+def _ranked():
+    return AuctionReputation.objects.annotate(
+        rank=Window(Rank(), order_by=[F("reputation").desc(), F("total_earnings").desc()])
+    )
+
+
+def _entry(row):
+    return {
+        "rank": row.rank,
+        "character_id": row.character_id,
+        "name": row.character.name,
+        "reputation": row.reputation,
+        "total_sales": row.total_sales,
+        "total_earnings": row.total_earnings,
+    }
+
+
+def top(n=10):
+    """The top ``n`` sellers, ranked by reputation then earnings. Cached for CACHE_SECONDS."""
+    key = TOP_KEY.format(n=n)
+    entries = cache.get(key)
+    if entries is None:
+        entries = [_entry(row) for row in _ranked().select_related("character").order_by("rank", "character_id")[:n]]
+        cache.set(key, entries, CACHE_SECONDS)
+    return entries
+
+
+def rank_of(character):
+    """
+    The character's leaderboard entry, or None if they have never sold.
+
+    The rank comes from the RANK() window of top(), computed over the whole
+    board in a subquery before the character's row is picked out of it (an
+    ORM filter on character would be applied before the window). Cached for
+    CACHE_SECONDS.
+    """
+    character_id = getattr(character, "pk", character)
+    key = RANK_KEY.format(character_id=character_id)
+    entry = cache.get(key)
+    if entry is None:
+        qn = connection.ops.quote_name
+        board, params = _ranked().order_by().values_list("character_id", "rank").query.sql_with_params()
+        rank = RawSQL(
+            f"SELECT board.{qn('rank')} FROM ({board}) board WHERE board.{qn('character_id')} = %s",
+            (*params, character_id),
+        )
+        row = (
+            AuctionReputation.objects.filter(character_id=character_id)
+            .select_related("character")
+            .annotate(rank=rank)
+            .first()
+        )
+        entry = _entry(row) if row else {}
+        cache.set(key, entry, CACHE_SECONDS)
+    return entry or None
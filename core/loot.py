@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+
+from .catalog import get_catalog, get_ruin_drops
+
+
+def make_rng(seed=None):
+    """Seedable RNG for LootTable rolls."""
+    return random.Random(seed)
+
+
+class LootTable:
+    """A ruin's drop table as parallel arrays of items and independent drop chances."""
+
+    def __init__(self, items, chances):
+        self.items = list(items)
+        self.item_ids = [item.pk for item in self.items]
+        self.chances = [min(max(chance, 0.0), 1.0) for chance in chances]
+
+    @classmethod
+    def for_ruin(cls, ruin):
+        """The ruin's table, built from the catalog and cached until the catalog changes."""
+        ruin_id = getattr(ruin, "pk", ruin)
+        tables = get_catalog().derived.setdefault("loot_tables", {})
+        table = tables.get(ruin_id)
+        if table is None:
+            drops = get_ruin_drops(ruin_id)
+            table = tables[ruin_id] = cls([drop.item for drop in drops], [drop.drop_chance for drop in drops])
+        return table
+
+    def roll(self, rng=random):
+        """Roll one exploration and return the dropped Item objects."""
+        return [item for item, chance in zip(self.items, self.chances) if rng.random() <= chance]
+
+    def roll_many(self, n, rng=None):
+        """
+        Roll ``n`` explorations at once and return a Counter of item id -> drops.
+
+        Each item's count is one binomial draw rather than ``n`` rolls.
+        """
+        rng = rng or make_rng()
+        if n <= 0 or not self.items:
+            return Counter()
+        counts = [_binomial(rng, n, chance) for chance in self.chances]
+        return Counter({item_id: count for item_id, count in zip(self.item_ids, counts) if count})
+
+    def roll_each(self, n, rng=None):
+        """Roll ``n`` explorations and return one Counter of item id -> drops per exploration."""
+        rng = rng or make_rng()
+        if n <= 0:
+            return []
+        if not self.items:
+            return [Counter() for _ in range(n)]
+        return [
+            Counter({item_id: 1 for item_id, chance in zip(self.item_ids, self.chances) if rng.random() <= chance})
+            for _ in range(n)
+        ]
+
+
+def _binomial(rng, n, p):
+    if p <= 0.0:
+        return 0
+    if p >= 1.0:
+        return n
+    if hasattr(rng, "binomialvariate"):  # Python 3.12+
+        return rng.binomialvariate(n, p)
+    return sum(1 for _ in range(n) if rng.random() <= p)
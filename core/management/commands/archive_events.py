@@ -0,0 +1,52 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.models import EventLog, EventLogArchive
+
+
+class Command(BaseCommand):
+    help = "Moves EventLog rows older than --days into EventLogArchive, one chunk per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Keep this many days of live events")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(days=options["days"])
+        total = 0
+        while True:
+            moved = self.archive_chunk(cutoff, options["chunk_size"])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f"archived {total} events...")
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} events older than {cutoff:%Y-%m-%d}"))
+
+    def archive_chunk(self, cutoff, chunk_size):
+        with transaction.atomic():
+            rows = list(
+                EventLog.objects.filter(timestamp__lt=cutoff)
+                .order_by("timestamp", "id")
+                .values_list("id", "character_id", "timestamp", "message")[:chunk_size]
+            )
+            if not rows:
+                return 0
+
+            archives = []
+            rows.sort(key=lambda row: (row[1], row[2].year, row[2].month, row[2], row[0]))
+            for _, group in groupby(rows, key=lambda row: (row[1], row[2].year, row[2].month)):
+                group = list(group)
+                archives.append(EventLogArchive(
+                    character_id=group[0][1],
+                    period_start=group[0][2],
+                    period_end=group[-1][2],
+                    count=len(group),
+                    events=[[timestamp.isoformat(), message] for _, _, timestamp, message in group],
+                ))
+            EventLogArchive.objects.bulk_create(archives)
+            EventLog.objects.filter(id__in=[row[0] for row in rows]).delete()
+        return len(rows)
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures queries, wall time and allocations of the hot game flows on a seeded world "
+        "(in a rolled back transaction) and fails if they regress against the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_PARAMS.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument("--only", nargs="+", choices=sorted(benchmark.OPERATIONS), help="Measure only these operations")
+        parser.add_argument("--baseline", default=str(benchmark.BASELINE_PATH))
+        parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+        parser.add_argument("--time-tolerance", type=float, default=benchmark.TIME_TOLERANCE)
+        parser.add_argument("--alloc-tolerance", type=float, default=benchmark.ALLOC_TOLERANCE)
+        parser.add_argument("--queries-only", action="store_true", help="Ignore wall time and allocations")
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in benchmark.DEFAULT_PARAMS}
+        results = benchmark.run(only=options["only"], **params)
+
+        self.stdout.write(f"{'operation':<28} {'queries':>8} {'ms':>9} {'KiB':>9}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:<28} {result['queries']:>8} {result['time_ms']:>9.2f} {result['alloc_kb']:>9.1f}")
+
+        if options["update_baseline"]:
+            if options["only"]:
+                raise CommandError("--update-baseline needs a full run, drop --only")
+            benchmark.save_baseline(results, params, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        baseline = benchmark.load_baseline(options["baseline"])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING("No baseline for this database, run with --update-baseline"))
+            return
+        # The number of repetitions only changes how stable the timings are
+        sizes = {name: value for name, value in params.items() if name != "repeat"}
+        if {name: value for name, value in baseline["params"].items() if name != "repeat"} != sizes:
+            raise CommandError(f"Baseline was recorded with {baseline['params']}, rerun with the same sizes")
+        regressions = benchmark.compare(
+            results, baseline, options["time_tolerance"], options["alloc_tolerance"], check_time=not options["queries_only"]
+        )
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,122 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils.timezone import now
+
+from . import snapshots
+from .db import insert_or_add
+from .inventory import grant_items
+from .models import Auction, AuctionReputation, Character, InventoryItem
+
+
+class MarketError(Exception):
+    pass
+
+
+def list_item(seller, item, price, quantity=1):
+    """Move ``quantity`` of ``item`` out of the seller's inventory into a new listing."""
+    if price < 0 or quantity < 1:
+        raise MarketError("Invalid price or quantity")
+    with transaction.atomic():
+        taken = InventoryItem.objects.filter(
+            character=seller, item=item, quantity__gte=quantity
+        ).update(quantity=F("quantity") - quantity)
+        if not taken:
+            raise MarketError(f"{seller.name} does not have {quantity} x {item.name}")
+        snapshots.touch(seller.pk)
+        return Auction.objects.create(seller=seller, item=item, price=price, quantity=quantity)
+
+
+def cancel_listing(seller, auction_id):
+    """Withdraw an active listing and return its items to the seller."""
+    with transaction.atomic():
+        listing = Auction.objects.select_for_update().filter(pk=auction_id, seller=seller, status=Auction.ACTIVE).first()
+        if listing is None:
+            raise MarketError("Listing is not active")
+        Auction.objects.filter(pk=listing.pk).update(status=Auction.CANCELLED)
+        grant_items({(seller.pk, listing.item_id): listing.quantity})
+
+
+def search(item=None, rarity=None, item_type=None, min_price=None, max_price=None):
+    """Active listings matching the filters, cheapest first."""
+    listings = Auction.objects.filter(status=Auction.ACTIVE)
+    if item is not None:
+        listings = listings.filter(item=item)
+    if rarity is not None:
+        listings = listings.filter(item__rarity=rarity)
+    if item_type is not None:
+        listings = listings.filter(item__type=item_type)
+    if min_price is not None:
+        listings = listings.filter(price__gte=min_price)
+    if max_price is not None:
+        listings = listings.filter(price__lte=max_price)
+    return listings.select_related("item", "seller").order_by("price", "created_at", "pk")
+
+
+def order_book(item, depth=20):
+    """The ``depth`` cheapest active listings of ``item`` as (auction id, price, quantity) tuples."""
+    return list(
+        Auction.objects.filter(status=Auction.ACTIVE, item=item)
+        .order_by("price", "created_at", "pk")
+        .values_list("pk", "price", "quantity")[:depth]
+    )
+
+
+def buy(buyer, auction_id=None, item=None, max_price=None):
+    """
+    Buy one listing: ``auction_id`` if given, else the cheapest listing of ``item``.
+
+    The listing row is taken with SELECT ... FOR UPDATE SKIP LOCKED, so
+    concurrent buyers never get the same listing: a buyer racing for the
+    cheapest listing moves on to the next one instead of waiting.
+    """
+    listings = Auction.objects.select_for_update(skip_locked=True).filter(status=Auction.ACTIVE).exclude(seller=buyer)
+    if auction_id is not None:
+        listings = listings.filter(pk=auction_id)
+    elif item is not None:
+        listings = listings.filter(item=item).order_by("price", "created_at", "pk")
+    else:
+        raise MarketError("Nothing to buy")
+    if max_price is not None:
+        listings = listings.filter(price__lte=max_price)
+
+    with transaction.atomic():
+        listing = listings.first()
+        if listing is None:
+            raise MarketError("No listing available")
+
+        # Lock both characters in primary key order first. The UPDATE alone
+        # locks them in whatever order it visits them, so two opposite trades
+        # between the same pair could deadlock.
+        list(
+            Character.objects.select_for_update()
+            .filter(pk__in=(listing.seller_id, buyer.pk)).order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        # Pay the seller and charge the buyer in one statement; the buyer's row
+        # only matches if they can afford it.
+        paid = Character.objects.filter(
+            Q(pk=listing.seller_id) | Q(pk=buyer.pk, gold__gte=listing.price)
+        ).update(gold=F("gold") + Case(
+            When(pk=buyer.pk, then=Value(-listing.price)),
+            default=Value(listing.price),
+        ))
+        if paid != 2:
+            raise MarketError(f"{buyer.name} cannot afford {listing.price} gold")
+        snapshots.touch(listing.seller_id, buyer.pk)
+
+        Auction.objects.filter(pk=listing.pk).update(status=Auction.SOLD, buyer=buyer, sold_at=now())
+        grant_items({(buyer.pk, listing.item_id): listing.quantity})
+        record_sale(listing.seller_id, listing.price)
+
+        listing.status, listing.buyer, listing.sold_at = Auction.SOLD, buyer, now()
+    return listing
+
+
+def record_sale(seller_id, price):
+    """Add one sale to the seller's AuctionReputation row, creating it if needed, in one statement."""
+    insert_or_add(
+        AuctionReputation, ("character",), ("reputation", "total_sales", "total_earnings"),
+        [(seller_id, 1, 1, price, now())],
+        replace_fields=("last_updated",),
+    )
@@ -0,0 +1,86 @@
+import math
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from .events import buffered_events
+from .ratelimit import get_limiter
+
+
+class EventLogBufferMiddleware:
+    """
+    Writes the events a sync request logs outside any atomic block in one
+    bulk insert, whatever the response status. Events logged inside an
+    atomic block are written in its transaction (see buffered_events()).
+
+    Under ASGI only the async path runs, which does not buffer: sync DRF
+    and admin views write their events as they log them, and async views
+    rely on the units they run with sync_to_async (e.g. run_command) opening
+    their own buffer.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with buffered_events():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class CommandRateLimitMiddleware:
+    """
+    Throttles views marked with @rate_limited with a token bucket per
+    character, or per character and client (session cookie, else address)
+    with COMMAND_RATE_LIMIT_PER_CLIENT. Rejected requests get a 429 from
+    process_view, before authentication or any other ORM work.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs a sync process_view in a thread under ASGI
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def _key(self, request, view_kwargs):
+        character_id = view_kwargs.get("character_id")
+        if not settings.COMMAND_RATE_LIMIT_PER_CLIENT:
+            return str(character_id)
+        client = request.COOKIES.get(settings.SESSION_COOKIE_NAME) or request.META.get("REMOTE_ADDR", "")
+        return f"{character_id}:{client}"
+
+    def _too_many(self, wait):
+        response = JsonResponse({"detail": "Too many commands, slow down."}, status=429)
+        response["Retry-After"] = str(math.ceil(wait))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, "rate_limited", False):
+            wait = get_limiter().consume(self._key(request, view_kwargs))
+            if wait:
+                return self._too_many(wait)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, "rate_limited", False):
+            wait = await get_limiter().aconsume(self._key(request, view_kwargs))
+            if wait:
+                return self._too_many(wait)
+        return None
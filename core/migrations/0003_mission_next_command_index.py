@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.utils import normalize
+
+
+def build_next_command_index(apps, schema_editor):
+    MissionStep = apps.get_model('core', 'MissionStep')
+    CharacterMission = apps.get_model('core', 'CharacterMission')
+    CharacterMissionProgress = apps.get_model('core', 'CharacterMissionProgress')
+
+    steps = list(MissionStep.objects.all())
+    for step in steps:
+        step.normalized_description = normalize(step.description)
+    MissionStep.objects.bulk_update(steps, ['normalized_description'], batch_size=500)
+
+    for cm in CharacterMission.objects.filter(completed=False).iterator():
+        progress = (
+            CharacterMissionProgress.objects
+            .filter(character_mission=cm, completed=False)
+            .select_related('step')
+            .order_by('step__order')
+            .first()
+        )
+        if progress:
+            cm.next_step = progress.step
+            cm.next_command = progress.step.normalized_description
+            cm.save(update_fields=['next_step', 'next_command'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_character_reputation_character_is_npc_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='charactermission',
+            name='next_command',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='charactermission',
+            name='next_step',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.missionstep'),
+        ),
+        migrations.AddField(
+            model_name='missionstep',
+            name='normalized_description',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='charactermission',
+            index=models.Index(fields=['character', 'next_command'], name='charmission_next_command_idx'),
+        ),
+        migrations.RunPython(build_next_command_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+def mark_history_rewarded(apps, schema_editor):
+    # Missions completed before rewards existed were never meant to pay out;
+    # left unrewarded, the first settle_rewards() run would pay all of them.
+    CharacterMission = apps.get_model('core', 'CharacterMission')
+    CharacterMission.objects.filter(completed=True).update(rewarded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_mission_next_command_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='charactermission',
+            name='rewarded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_history_rewarded, migrations.RunPython.noop),
+    ]
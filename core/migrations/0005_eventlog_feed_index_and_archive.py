@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_charactermission_rewarded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('events', models.JSONField(help_text='List of [timestamp, message] pairs, oldest first')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='eventlog',
+            index=models.Index(fields=['character', '-timestamp', '-id'], name='eventlog_character_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventlog',
+            index=models.Index(fields=['timestamp'], name='eventlog_timestamp_idx'),
+        ),
+        migrations.AddField(
+            model_name='eventlogarchive',
+            name='character',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to='core.character'),
+        ),
+        migrations.AddIndex(
+            model_name='eventlogarchive',
+            index=models.Index(fields=['character', '-period_end'], name='eventarchive_character_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:57
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_stacks(apps, schema_editor):
+    InventoryItem = apps.get_model('core', 'InventoryItem')
+    duplicates = (
+        InventoryItem.objects
+        .values('character_id', 'item_id')
+        .annotate(rows=Count('id'), total=Sum('quantity'), keep=Min('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for stack in duplicates:
+        InventoryItem.objects.filter(pk=stack['keep']).update(quantity=stack['total'])
+        InventoryItem.objects.filter(
+            character_id=stack['character_id'], item_id=stack['item_id']
+        ).exclude(pk=stack['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_eventlog_feed_index_and_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_stacks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inventoryitem',
+            constraint=models.UniqueConstraint(fields=('character', 'item'), name='unique_inventory_stack'),
+        ),
+    ]
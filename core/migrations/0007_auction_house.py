@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def cancel_legacy_listings(apps, schema_editor):
+    # Listings from before the auction house never escrowed their items, which
+    # stayed in the sellers' inventories: buying one would hand out an item
+    # nobody gave up. They are cancelled instead of becoming active.
+    Auction = apps.get_model('core', 'Auction')
+    Auction.objects.update(status='cancelled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_unique_inventory_stack'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='buyer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='core.character'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='quantity',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='sold_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('sold', 'Sold'), ('cancelled', 'Cancelled')], default='active', max_length=10),
+        ),
+        migrations.RunPython(cancel_legacy_listings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['item', 'price', 'created_at'], name='auction_active_item_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['price', 'created_at'], name='auction_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['seller', 'status'], name='auction_seller_status_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:58
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_reputations(apps, schema_editor):
+    AuctionReputation = apps.get_model('core', 'AuctionReputation')
+    duplicates = (
+        AuctionReputation.objects
+        .values('character_id')
+        .annotate(
+            rows=Count('id'), keep=Min('id'),
+            reputation_total=Sum('reputation'), sales=Sum('total_sales'), earnings=Sum('total_earnings'),
+        )
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        AuctionReputation.objects.filter(pk=row['keep']).update(
+            reputation=row['reputation_total'], total_sales=row['sales'], total_earnings=row['earnings'],
+        )
+        AuctionReputation.objects.filter(character_id=row['character_id']).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auction_house'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_reputations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auctionreputation',
+            index=models.Index(fields=['-reputation', '-total_earnings', 'character'], name='auctionrep_leaderboard_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='auctionreputation',
+            constraint=models.UniqueConstraint(fields=('character',), name='unique_auction_reputation'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:00
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import F
+
+
+def merge_duplicate_pairs(apps, schema_editor):
+    Friendship = apps.get_model('core', 'Friendship')
+    Friendship.objects.filter(from_character=F('to_character')).delete()
+    seen = set()
+    duplicates = []
+    # Keep the accepted row of a pair if there is one, else the oldest request
+    for pk, a, b in Friendship.objects.order_by('-accepted', 'created_at', 'pk').values_list('pk', 'from_character_id', 'to_character_id'):
+        pair = (min(a, b), max(a, b))
+        if pair in seen:
+            duplicates.append(pk)
+        seen.add(pair)
+    Friendship.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_auction_reputation_leaderboard'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_pairs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['from_character', 'accepted', 'to_character'], name='friendship_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['to_character', 'accepted', 'from_character'], name='friendship_to_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Least('from_character', 'to_character'), django.db.models.functions.comparison.Greatest('from_character', 'to_character'), name='unique_friendship_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.CheckConstraint(condition=models.Q(('from_character', models.F('to_character')), _negated=True), name='friendship_not_self'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_friendship_pairs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='characterlocation',
+            name='character',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='location', to='core.character'),
+        ),
+        migrations.AddIndex(
+            model_name='characterlocation',
+            index=models.Index(fields=['zone', '-last_moved'], name='location_zone_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_location_presence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='character',
+            name='energy_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_character_energy_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ruin',
+            name='energy_cost',
+            field=models.PositiveIntegerField(default=10),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_ruin_energy_cost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('replacement', models.CharField(help_text='What the alias stands for. A one-word alias for one word is also applied inside longer commands.', max_length=255)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_command_alias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField()),
+                ('sequence', models.PositiveBigIntegerField()),
+                ('command', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('character', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='command_history', to='core.character')),
+            ],
+            options={
+                'verbose_name_plural': 'command history',
+                'constraints': [models.UniqueConstraint(fields=('character', 'slot'), name='unique_command_history_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    CharacterMissionProgress = apps.get_model('core', 'CharacterMissionProgress')
+    duplicates = (
+        CharacterMissionProgress.objects
+        .values('character_mission_id', 'step_id')
+        .annotate(rows=Count('id'), keep=Min('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for progress in duplicates:
+        copies = CharacterMissionProgress.objects.filter(
+            character_mission_id=progress['character_mission_id'], step_id=progress['step_id']
+        )
+        # A step done in any of the copies stays done
+        if copies.filter(completed=True).exists():
+            copies.filter(pk=progress['keep']).update(completed=True)
+        copies.exclude(pk=progress['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_command_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='charactermission',
+            name='charmission_next_command_idx',
+        ),
+        migrations.AddIndex(
+            model_name='charactermission',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['character', 'next_command'], name='charmission_open_command_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='charactermission',
+            index=models.Index(condition=models.Q(('completed', True), ('rewarded', False)), fields=['id'], name='charmission_unrewarded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textcommand',
+            index=models.Index(fields=['character', '-created_at', '-id'], name='textcommand_recent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactermissionprogress',
+            constraint=models.UniqueConstraint(fields=('character_mission', 'step'), name='unique_mission_progress_step'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# (table, column, index) of the single-column foreign key indexes made
+# redundant by a constraint or composite index leading with the same column
+REDUNDANT_INDEXES = [
+    ('core_auction', 'seller_id', 'core_auction_seller_id_ba922f39'),
+    ('core_charactermissionprogress', 'character_mission_id', 'core_charactermissionprogress_character_mission_id_868b79e9'),
+    ('core_commandhistory', 'character_id', 'core_commandhistory_character_id_1e774726'),
+    ('core_eventlog', 'character_id', 'core_eventlog_character_id_86072901'),
+    ('core_inventoryitem', 'character_id', 'core_inventoryitem_character_id_2756e592'),
+    ('core_textcommand', 'character_id', 'core_textcommand_character_id_1a70f0bf'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_hot_lookup_indexes'),
+    ]
+
+    # Dropping the indexes directly: AlterField would also drop and re-add
+    # each foreign key constraint, revalidating every row of large tables.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'DROP INDEX IF EXISTS "{index}"',
+                    reverse_sql=f'CREATE INDEX "{index}" ON "{table}" ("{column}")',
+                )
+                for table, column, index in REDUNDANT_INDEXES
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='auction',
+                    name='seller',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='auctions', to='core.character'),
+                ),
+                migrations.AlterField(
+                    model_name='charactermissionprogress',
+                    name='character_mission',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='core.charactermission'),
+                ),
+                migrations.AlterField(
+                    model_name='commandhistory',
+                    name='character',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='command_history', to='core.character'),
+                ),
+                migrations.AlterField(
+                    model_name='eventlog',
+                    name='character',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='core.character'),
+                ),
+                migrations.AlterField(
+                    model_name='inventoryitem',
+                    name='character',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='core.character'),
+                ),
+                migrations.AlterField(
+                    model_name='textcommand',
+                    name='character',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.character'),
+                ),
+            ],
+        ),
+    ]
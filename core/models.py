@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Greatest, Least
 from django.contrib.auth.models import User
 from django.utils.timezone import now
+from . import snapshots
+from .events import buffered_events, current_buffer, publish_events
 from .utils import normalize
 
 # --------------------------
@@ -12,7 +16,9 @@ class Character(models.Model):
     title = models.CharField(max_length=100, blank=True)
     bio = models.TextField(blank=True)
     xp = models.IntegerField(default=0)
+    # Energy as of energy_updated_at; it regenerates lazily, see core.energy.
     energy = models.IntegerField(default=300)
+    energy_updated_at = models.DateTimeField(default=now)
     gold = models.IntegerField(default=500)
     level = models.IntegerField(default=1)
     is_npc = models.BooleanField(default=False, db_index=True)
@@ -20,6 +26,11 @@ class Character(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def current_energy(self):
+        from .energy import current_energy
+        return current_energy(self)
+
 # --------------------------
 # Character Stats
 # --------------------------
@@ -71,10 +82,16 @@ class Item(models.Model):
     craftable = models.BooleanField(default=False)
 
 class InventoryItem(models.Model):
-    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="inventory")
+    # Indexed by unique_inventory_stack
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="inventory", db_index=False)
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["character", "item"], name="unique_inventory_stack"),
+        ]
+
 # --------------------------
 # Crafting
 # --------------------------
@@ -96,6 +113,7 @@ class Ruin(models.Model):
     description = models.TextField()
     required_level = models.IntegerField(default=0)
     unlocked = models.BooleanField(default=False)
+    energy_cost = models.PositiveIntegerField(default=10)
 
 class Component(models.Model):
     name = models.CharField(max_length=100)
@@ -116,45 +134,139 @@ class CharacterMission(models.Model):
     character = models.ForeignKey(Character, on_delete=models.CASCADE)
     mission = models.ForeignKey(Mission, on_delete=models.CASCADE)
     completed = models.BooleanField(default=False)
+    rewarded = models.BooleanField(default=False, editable=False)
+    # Expected next command index: the current step and its normalized text,
+    # kept in sync with progress so commands resolve with a single lookup.
+    next_step = models.ForeignKey("MissionStep", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    next_command = models.TextField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # TextCommand lookups and active mission lists only ever want open missions
+            models.Index(fields=["character", "next_command"], condition=models.Q(completed=False), name="charmission_open_command_idx"),
+            # settle_rewards() backlog
+            models.Index(fields=["id"], condition=models.Q(completed=True, rewarded=False), name="charmission_unrewarded_idx"),
+        ]
 
     def current_step(self):
-        return self.progress.filter(completed=False).order_by("step__order").first()
+        return self.progress.filter(completed=False).select_related("step").order_by("step__order").first()
+
+    @staticmethod
+    def _pending_progress():
+        return CharacterMissionProgress.objects.filter(
+            character_mission=OuterRef("pk"), completed=False
+        ).order_by("step__order")
+
+    @classmethod
+    def refresh_next_steps(cls, missions):
+        """Recompute the next-command index of every mission in the ``missions`` queryset with one UPDATE."""
+        pending = cls._pending_progress()
+        return missions.update(
+            next_step=Subquery(pending.values("step")[:1]),
+            next_command=Subquery(pending.values("step__normalized_description")[:1]),
+        )
+
+    def refresh_next_step(self):
+        CharacterMission.refresh_next_steps(CharacterMission.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=["next_step", "next_command"])
+        snapshots.touch(self.character_id)
 
     def complete_step(self, step):
-        progress = self.progress.filter(step=step).first()
-        if progress and not progress.completed:
-            progress.completed = True
-            progress.save()
-            EventLog.log(self.character, f"{self.character.name} completed the step '{step.description}' in mission '{self.mission.name}'")
+        # savepoint=False: when nested in a caller's transaction, failures
+        # roll back with it instead of costing two SAVEPOINT round trips.
+        with transaction.atomic(savepoint=False), buffered_events():
+            # The conditional update is the lock: concurrent commands for the
+            # same step race on it and only one of them sees a row change.
+            if not self.progress.filter(step=step, completed=False).update(completed=True):
+                return False
+
+            # Advance the next-command index and fold the "all steps done"
+            # check into the same UPDATE.
+            pending = self._pending_progress()
+            CharacterMission.objects.filter(pk=self.pk).update(
+                completed=~Exists(pending),
+                next_step=Subquery(pending.values("step")[:1]),
+                next_command=Subquery(pending.values("step__normalized_description")[:1]),
+            )
+            self.refresh_from_db(fields=["completed", "next_step", "next_command"])
+            snapshots.touch(self.character_id)
+
+            character = self.character
+            EventLog.log(character, f"{character.name} completed the step '{step.description}' in mission '{self.mission.name}'")
             if step.success_response:
-                EventLog.log(self.character, step.success_response)
-            if not self.progress.filter(completed=False).exists():
-                self.completed = True
-                self.save()
-                EventLog.log(self.character, f"{self.character.name} completed the mission '{self.mission.name}' 🎉")
+                EventLog.log(character, step.success_response)
+            if self.completed:
+                EventLog.log(character, f"{character.name} completed the mission '{self.mission.name}' 🎉")
+                from .rewards import settle_mission_rewards
+                settle_mission_rewards(self)
+        return True
 
 class MissionStep(models.Model):
     mission = models.ForeignKey(Mission, on_delete=models.CASCADE, related_name="steps")
     description = models.TextField()
     order = models.PositiveIntegerField()
     success_response = models.TextField(blank=True, help_text="Narrative response shown when this step is completed")
+    normalized_description = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ['order']
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.normalized_description = normalize(self.description)
+        super().save(*args, **kwargs)
+        if not adding:
+            # The text or the order may have changed: either can change which
+            # step is next, and what it is called, for the open missions.
+            self.refresh_open_missions()
+
+    def refresh_open_missions(self):
+        """Recompute the next-command index of the open CharacterMissions of this step's mission."""
+        missions = CharacterMission.objects.filter(mission_id=self.mission_id, completed=False)
+        if CharacterMission.refresh_next_steps(missions):
+            snapshots.touch(*missions.values_list("character_id", flat=True))
+
 class CharacterMissionProgress(models.Model):
-    character_mission = models.ForeignKey(CharacterMission, on_delete=models.CASCADE, related_name="progress")
+    # Indexed by unique_mission_progress_step
+    character_mission = models.ForeignKey(CharacterMission, on_delete=models.CASCADE, related_name="progress", db_index=False)
     step = models.ForeignKey(MissionStep, on_delete=models.CASCADE)
     completed = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["character_mission", "step"], name="unique_mission_progress_step"),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.character_mission.refresh_next_step()
+
 # --------------------------
 # Marketplace
 # --------------------------
 class Auction(models.Model):
-    seller = models.ForeignKey(Character, on_delete=models.CASCADE, related_name='auctions')
+    ACTIVE = 'active'
+    SOLD = 'sold'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [(ACTIVE, 'Active'), (SOLD, 'Sold'), (CANCELLED, 'Cancelled')]
+
+    # Indexed by auction_seller_status_idx
+    seller = models.ForeignKey(Character, on_delete=models.CASCADE, related_name='auctions', db_index=False)
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=1)
     price = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    buyer = models.ForeignKey(Character, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchases')
+    sold_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Order books: cheapest active listings for an item, or overall
+            models.Index(fields=['item', 'price', 'created_at'], condition=models.Q(status='active'), name='auction_active_item_price_idx'),
+            models.Index(fields=['price', 'created_at'], condition=models.Q(status='active'), name='auction_active_price_idx'),
+            models.Index(fields=['seller', 'status'], name='auction_seller_status_idx'),
+        ]
 
 class AuctionReputation(models.Model):
     character = models.ForeignKey(Character, on_delete=models.CASCADE)
@@ -165,6 +277,14 @@ class AuctionReputation(models.Model):
 
     class Meta:
         ordering = ['-reputation', '-total_earnings']
+        constraints = [
+            models.UniqueConstraint(fields=['character'], name='unique_auction_reputation'),
+        ]
+        indexes = [
+            # Matches Meta.ordering; character_id rides along so leaderboard
+            # pages can be read from the index alone.
+            models.Index(fields=['-reputation', '-total_earnings', 'character'], name='auctionrep_leaderboard_idx'),
+        ]
 
 # --------------------------
 # Social
@@ -175,6 +295,17 @@ class Friendship(models.Model):
     accepted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One row per unordered pair, whichever side sent the request
+            models.UniqueConstraint(Least('from_character', 'to_character'), Greatest('from_character', 'to_character'), name='unique_friendship_pair'),
+            models.CheckConstraint(condition=~models.Q(from_character=models.F('to_character')), name='friendship_not_self'),
+        ]
+        indexes = [
+            models.Index(fields=['from_character', 'accepted', 'to_character'], name='friendship_from_idx'),
+            models.Index(fields=['to_character', 'accepted', 'from_character'], name='friendship_to_idx'),
+        ]
+
 class CharacterReputation(models.Model):
     character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="npc_reputations")
     npc = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="reputation_from_players")
@@ -196,42 +327,115 @@ class Zone(models.Model):
         return self.name
 
 class CharacterLocation(models.Model):
-    character = models.OneToOneField(Character, on_delete=models.CASCADE)
+    character = models.OneToOneField(Character, on_delete=models.CASCADE, related_name="location")
     zone = models.ForeignKey(Zone, on_delete=models.SET_NULL, null=True)
     last_moved = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["zone", "-last_moved"], name="location_zone_recent_idx"),
+        ]
+
 class EventLog(models.Model):
-    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="events")
+    # Indexed by eventlog_character_feed_idx
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="events", db_index=False)
     message = models.TextField()
     timestamp = models.DateTimeField(default=now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["character", "-timestamp", "-id"], name="eventlog_character_feed_idx"),
+            models.Index(fields=["timestamp"], name="eventlog_timestamp_idx"),
+        ]
+
     @classmethod
     def log(cls, character, message):
-        return cls.objects.create(character=character, message=message)
+        event = cls(character=character, message=message)
+        buffer = current_buffer()
+        if buffer is None:
+            event.save()
+            publish_events([event])
+        else:
+            buffer.add(event)
+        return event
+
+class EventLogArchive(models.Model):
+    """Old EventLog rows of one character, packed into a single row per chunk and month."""
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="archived_events")
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    events = models.JSONField(help_text="List of [timestamp, message] pairs, oldest first")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["character", "-period_end"], name="eventarchive_character_idx"),
+        ]
+
+class CommandAlias(models.Model):
+    alias = models.CharField(max_length=100, unique=True)
+    replacement = models.CharField(
+        max_length=255,
+        help_text="What the alias stands for. A one-word alias for one word is also applied inside longer commands.",
+    )
+
+    def __str__(self):
+        return f"{self.alias} → {self.replacement}"
+
+class CommandHistory(models.Model):
+    """A character's last COMMAND_HISTORY_SIZE commands; slot ``sequence % size`` is overwritten in place."""
+    # Indexed by unique_command_history_slot
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="command_history", db_index=False)
+    slot = models.PositiveIntegerField()
+    sequence = models.PositiveBigIntegerField()
+    command = models.CharField(max_length=255)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "command history"
+        constraints = [
+            models.UniqueConstraint(fields=["character", "slot"], name="unique_command_history_slot"),
+        ]
 
 class TextCommand(models.Model):
-    character = models.ForeignKey(Character, on_delete=models.CASCADE)
+    # Indexed by textcommand_recent_idx
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, db_index=False)
     command = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # get_history() in audit mode
+            models.Index(fields=["character", "-created_at", "-id"], name="textcommand_recent_idx"),
+        ]
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        EventLog.log(self.character, f"{self.character.name} executed command: '{self.command}'")
-
-        character_missions = CharacterMission.objects.filter(character=self.character, completed=False)
-        matched = False
-        for cm in character_missions:
-            step = cm.current_step()
-            if step and normalize(step.step.description) == normalize(self.command):
-                cm.complete_step(step.step)
-                matched = True
-                break
-
-        if not matched:
-            location = getattr(self.character, "location", None)
-            zone = getattr(location, "zone", None)
-            fallback = zone.fallback_message if zone and zone.fallback_message else "Nothing happened... maybe try something else."
-            EventLog.log(self.character, fallback)
+        with transaction.atomic(savepoint=False), buffered_events():
+            super().save(*args, **kwargs)
+            EventLog.log(self.character, f"{self.character.name} executed command: '{self.command}'")
+            self.process()
+
+    def process(self):
+        """Complete the mission step the command matches, or log the zone's fallback message."""
+        with transaction.atomic(savepoint=False), buffered_events():
+            from .parser import get_parser
+            cm = (
+                CharacterMission.objects
+                .filter(character=self.character, completed=False, next_command__in=get_parser().candidates(self.command))
+                .select_related("next_step", "mission")
+                .order_by("pk")
+                .first()
+            )
+            if cm is not None:
+                cm.character = self.character
+            # A lost race for the step (or a stale index) falls back like a miss
+            matched = cm is not None and cm.complete_step(cm.next_step)
+
+            if not matched:
+                from . import catalog, presence
+                zone = catalog.get_zone(presence.zone_of(self.character))
+                fallback = zone.fallback_message if zone and zone.fallback_message else "Nothing happened... maybe try something else."
+                EventLog.log(self.character, fallback)
 
 # --------------------------
 # Ruin Loot Table
@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+from itertools import islice, product
+
+from .catalog import get_catalog
+from .models import CommandAlias, MissionStep
+from .utils import normalize
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+@lru_cache(maxsize=65536)
+def normalize_token(token):
+    """normalize() one word and strip its punctuation. Cached: players repeat the same few hundred words."""
+    return _NON_WORD.sub("", normalize(token))
+
+
+def tokenize(text):
+    return [token for token in map(normalize_token, text.split()) if token]
+
+
+# At most this many corrected spellings of a command are looked up
+MAX_CORRECTIONS = 32
+
+
+def max_edits(length):
+    """Typos tolerated in a word of ``length`` characters: none in short words, where they change the meaning."""
+    if length < 4:
+        return 0
+    return 1 if length < 8 else 2
+
+
+def _deletes(word, depth):
+    """``word`` with every combination of up to ``depth`` characters removed, itself included."""
+    variants, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b):
+    """Edits (insert, delete, substitute, swap neighbours) between ``a`` and ``b``."""
+    before_previous, previous = None, list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        row = [i]
+        for j, other in enumerate(b, 1):
+            cost = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (char != other))
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == other and char != other:
+                cost = min(cost, before_previous[j - 2] + 1)
+            row.append(cost)
+        before_previous, previous = previous, row
+    return previous[-1]
+
+
+class CommandParser:
+    """
+    Maps what a player typed to the mission step phrases it could mean.
+
+    Both commands and phrases are reduced to a canonical form: normalized
+    words with punctuation stripped, a command matching a whole alias
+    replaced by it, and one-word aliases ("walk" -> "go") applied word by
+    word. Canonical phrases live in a dict for exact hits.
+
+    Typos are fixed word by word against the vocabulary of the phrases,
+    which grows far slower than the phrase catalog. The vocabulary is
+    precompiled into a symmetric delete index: every word is filed under
+    each spelling left after removing up to ``max_edits`` characters, so
+    the words near a typo are found by generating the typo's own deletions
+    and looking them up, instead of walking the vocabulary. The corrected
+    phrases are then looked up in the dict.
+    """
+
+    def __init__(self, phrases, aliases):
+        self.phrase_aliases = {}
+        self.word_aliases = {}
+        for alias, replacement in aliases:
+            alias, replacement = tokenize(alias), tokenize(replacement)
+            if not alias or not replacement:
+                continue
+            self.phrase_aliases[" ".join(alias)] = replacement
+            if len(alias) == 1 and len(replacement) == 1:
+                self.word_aliases[alias[0]] = replacement[0]
+
+        # canonical phrase -> the stored phrases (CharacterMission.next_command values) it stands for
+        self.phrases = {}
+        for phrase in phrases:
+            self.phrases.setdefault(self._canonical(tokenize(phrase)), set()).add(phrase)
+
+        self.vocabulary = {word for key in self.phrases for word in key.split()}
+        self.deletes = {}
+        for word in self.vocabulary:
+            for variant in _deletes(word, max_edits(len(word))):
+                self.deletes.setdefault(variant, []).append(word)
+
+    def canonical(self, text):
+        return self._canonical(tokenize(text))
+
+    def _canonical(self, tokens):
+        tokens = self.phrase_aliases.get(" ".join(tokens), tokens)
+        return " ".join(self.word_aliases.get(token, token) for token in tokens)
+
+    def candidates(self, command):
+        """
+        The stored phrases ``command`` could mean: the exact normalized
+        command, plus the phrases it spells once each unknown word is
+        replaced by its closest known words.
+        """
+        candidates = {normalize(command)}
+        key = self.canonical(command)
+        if key in self.phrases:
+            candidates.update(self.phrases[key])
+            return candidates
+
+        spellings = []
+        for word in key.split():
+            if word in self.vocabulary:
+                spellings.append([word])
+                continue
+            corrections = self.correct(word)
+            if not corrections:
+                return candidates
+            spellings.append(sorted(corrections))
+        for words in islice(product(*spellings), MAX_CORRECTIONS):
+            candidates.update(self.phrases.get(" ".join(words), ()))
+        return candidates
+
+    def correct(self, word):
+        """
+        The known words closest to ``word``. A pair of words may differ by
+        as many edits as ``max_edits`` allows the shorter of the two.
+        """
+        best, found = None, set()
+        seen = set()
+        for variant in _deletes(word, max_edits(len(word))):
+            for known in self.deletes.get(variant, ()):
+                if known in seen:
+                    continue
+                seen.add(known)
+                distance = edit_distance(word, known)
+                if distance > max_edits(min(len(word), len(known))):
+                    continue
+                if best is None or distance < best:
+                    best, found = distance, {known}
+                elif distance == best:
+                    found.add(known)
+        return found
+
+
+def get_parser():
+    """This worker's parser, rebuilt when the catalog changes (mission steps and aliases are catalog models)."""
+    derived = get_catalog().derived
+    parser = derived.get("command_parser")
+    if parser is None:
+        parser = derived["command_parser"] = CommandParser(
+            MissionStep.objects.exclude(normalized_description="").values_list("normalized_description", flat=True).distinct(),
+            CommandAlias.objects.values_list("alias", "replacement"),
+        )
+    return parser
@@ -0,0 +1,125 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from .models import CharacterLocation
+
+ZONE_KEY = "core:presence:zone:{zone_id}"
+CHARACTER_KEY = "core:presence:character:{character_id}"
+LOCK_KEY = "core:presence:lock:{zone_id}"
+NOWHERE = 0
+
+
+def _ttl():
+    return settings.PRESENCE_TTL_SECONDS
+
+
+def _fresh(members):
+    cutoff = time.time() - _ttl()
+    return {character_id: entry for character_id, entry in members.items() if entry[0] >= cutoff}
+
+
+class _ZoneLock:
+    """
+    Best-effort mutex around a zone's member set, built on the atomic
+    cache.add(). Entering gives whether the lock was taken; it is released
+    only if it still holds this holder's token.
+    """
+
+    def __init__(self, zone_id):
+        self.key = LOCK_KEY.format(zone_id=zone_id)
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+
+    def __enter__(self):
+        for _ in range(50):
+            if cache.add(self.key, self.token, timeout=2):
+                self.acquired = True
+                break
+            time.sleep(0.002)
+        return self.acquired
+
+    def __exit__(self, *exc):
+        if self.acquired and cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+
+def _load_zone(zone_id):
+    """Rebuild a zone's member set from CharacterLocation, e.g. after a cache eviction."""
+    cutoff = now() - timedelta(seconds=_ttl())
+    rows = (
+        CharacterLocation.objects
+        .filter(zone_id=zone_id, last_moved__gte=cutoff)
+        .values_list("character_id", "character__name", "last_moved")
+    )
+    return {character_id: (last_moved.timestamp(), name) for character_id, name, last_moved in rows}
+
+
+def _members(zone_id):
+    members = cache.get(ZONE_KEY.format(zone_id=zone_id))
+    if members is None:
+        members = _load_zone(zone_id)
+        cache.set(ZONE_KEY.format(zone_id=zone_id), members, _ttl())
+    return members
+
+
+def _update_zone(zone_id, change):
+    with _ZoneLock(zone_id) as locked:
+        if not locked:
+            # Writing now could undo the holder's change: drop the set instead,
+            # and the next read rebuilds it from CharacterLocation.
+            cache.delete(ZONE_KEY.format(zone_id=zone_id))
+            return
+        members = _fresh(_members(zone_id))
+        change(members)
+        cache.set(ZONE_KEY.format(zone_id=zone_id), members, _ttl())
+
+
+def character_moved(location):
+    """Move the character's presence entry to ``location.zone``. Called on every CharacterLocation save."""
+    character_id = location.character_id
+    previous = cache.get(CHARACTER_KEY.format(character_id=character_id))
+    if previous and previous != location.zone_id:
+        _update_zone(previous, lambda members: members.pop(character_id, None))
+    if location.zone_id:
+        entry = (location.last_moved.timestamp(), location.character.name)
+        _update_zone(location.zone_id, lambda members: members.__setitem__(character_id, entry))
+    cache.set(CHARACTER_KEY.format(character_id=character_id), location.zone_id or NOWHERE, _ttl())
+
+
+def character_left(character_id):
+    previous = cache.get(CHARACTER_KEY.format(character_id=character_id))
+    if previous:
+        _update_zone(previous, lambda members: members.pop(character_id, None))
+    cache.set(CHARACTER_KEY.format(character_id=character_id), NOWHERE, _ttl())
+
+
+def whos_here(zone):
+    """
+    Characters seen in ``zone`` within PRESENCE_TTL_SECONDS, as a dict of
+    character id -> name. Served from the cache; the database is only read
+    to rebuild a zone whose entry was evicted.
+    """
+    zone_id = getattr(zone, "pk", zone)
+    return {character_id: name for character_id, (_, name) in _fresh(_members(zone_id)).items()}
+
+
+def zone_of(character):
+    """The id of the zone the character is in, or None."""
+    character_id = getattr(character, "pk", character)
+    key = CHARACTER_KEY.format(character_id=character_id)
+    zone_id = cache.get(key)
+    if zone_id is None:
+        zone_id = CharacterLocation.objects.filter(character_id=character_id).values_list("zone_id", flat=True).first() or NOWHERE
+        cache.set(key, zone_id, _ttl())
+    return zone_id or None
+
+
+def move_character(character, zone):
+    """Put the character in ``zone``, creating their location if needed."""
+    location, _ = CharacterLocation.objects.update_or_create(character=character, defaults={"zone": zone})
+    return location
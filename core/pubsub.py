@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """A subscriber's queue on one channel. Iterate it with ``async for``."""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stalled client loses live messages; it can catch up from the
+            # event log with Last-Event-ID when it reconnects.
+            pass
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """
+    In-process publish/subscribe. Subscribers live on an event loop; publish()
+    may be called from any thread. A broker backed by Redis or Postgres
+    LISTEN/NOTIFY can replace it through the PUBSUB_BROKER setting as long as
+    it offers the same subscribe/unsubscribe/publish methods.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self.lock:
+            self.subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            channel = self.subscribers.get(subscription.channel)
+            if channel is not None:
+                channel.discard(subscription)
+                if not channel:
+                    del self.subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            if subscription.loop.is_closed():
+                self.unsubscribe(subscription)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+
+
+class RedisBroker(LocalBroker):
+    """
+    LocalBroker fanned out through Redis pub/sub, so subscribers get the
+    messages published by every worker process. Each worker listens to all
+    channels on one pattern subscription, read by a background thread that
+    hands messages to its local subscribers; the thread starts with the
+    worker's first subscriber, so processes that only publish never run it.
+    """
+
+    prefix = "core:pubsub:"
+
+    def __init__(self, queue_size=100, url=None):
+        import redis
+
+        super().__init__(queue_size)
+        self.redis = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.listener = None
+
+    def subscribe(self, channel):
+        with self.lock:
+            if self.listener is None:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(**{f"{self.prefix}*": self._receive})
+                self.listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        return super().subscribe(channel)
+
+    def _receive(self, message):
+        channel = message["channel"].decode().removeprefix(self.prefix)
+        super().publish(channel, json.loads(message["data"]))
+
+    def publish(self, channel, message):
+        self.redis.publish(self.prefix + channel, json.dumps(message))
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.PUBSUB_BROKER)()
+    return _broker
+
+
+def character_channel(character_id):
+    return f"character:{character_id}"
@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+class TokenBucket:
+    """
+    Token bucket arithmetic shared by the backends: a key holds up to
+    ``burst`` tokens, regains ``rate`` tokens per second and spends one per
+    request. Buckets idle long enough to be full again carry no information,
+    so the backends are free to forget them.
+    """
+
+    def __init__(self, burst=None, rate=None):
+        self.burst = burst if burst is not None else settings.COMMAND_RATE_LIMIT_BURST
+        self.rate = rate if rate is not None else settings.COMMAND_RATE_LIMIT_PER_SECOND
+        self.ttl = self.burst / self.rate
+
+    def take(self, state, at):
+        """Spend a token from ``state`` (``(tokens, updated_at)`` or None). Returns the new state and the seconds to wait, 0 if allowed."""
+        tokens, updated_at = state if state is not None else (self.burst, at)
+        tokens = min(self.burst, tokens + (at - updated_at) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, at), 0
+        return (tokens, at), (1 - tokens) / self.rate
+
+
+class LocalBackend(TokenBucket):
+    """Buckets in this worker's memory. Only right with a single worker (see core.checks)."""
+
+    def __init__(self, *args, sweep_seconds=60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.sweep_seconds = sweep_seconds
+        self.swept_at = time.monotonic()
+
+    def consume(self, key):
+        at = time.monotonic()
+        with self.lock:
+            self.buckets[key], wait = self.take(self.buckets.get(key), at)
+            if at - self.swept_at >= self.sweep_seconds:
+                self.buckets = {k: state for k, state in self.buckets.items() if at - state[1] < self.ttl}
+                self.swept_at = at
+        return wait
+
+    async def aconsume(self, key):
+        return self.consume(key)
+
+
+class CacheBackend(TokenBucket):
+    """
+    Buckets in the default cache, shared by every worker and expired by the
+    cache itself. Reading and writing a bucket are two cache calls, so two
+    workers racing on one key can both spend the same token: the limit is
+    approximate by at most one request per racing worker.
+    """
+
+    key_prefix = "core:ratelimit:"
+
+    def consume(self, key):
+        key = self.key_prefix + key
+        state, wait = self.take(cache.get(key), time.time())
+        cache.set(key, state, math.ceil(self.ttl))
+        return wait
+
+    async def aconsume(self, key):
+        key = self.key_prefix + key
+        state, wait = self.take(await cache.aget(key), time.time())
+        await cache.aset(key, state, math.ceil(self.ttl))
+        return wait
+
+
+_limiter = None
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = import_string(settings.COMMAND_RATE_LIMIT_BACKEND)()
+    return _limiter
+
+
+def rate_limited(view):
+    """Mark a view taking a ``character_id`` URL argument for CommandRateLimitMiddleware."""
+    view.rate_limited = True
+    return view
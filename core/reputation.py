@@ -0,0 +1,77 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest, Least
+
+from .db import insert_or_add
+from .models import CharacterReputation
+
+REPUTATION_MIN = -1000
+REPUTATION_MAX = 1000
+CACHE_SECONDS = 300
+VECTOR_KEY = "core:reputation:{character_id}"
+
+
+def _clamp_delta(delta):
+    # Any delta wider than the whole range has the same effect as the width
+    span = REPUTATION_MAX - REPUTATION_MIN
+    return max(-span, min(span, delta))
+
+
+def apply_deltas(deltas):
+    """
+    Apply ``(character_id, npc_id, delta)`` changes in one upsert per batch.
+
+    Deltas for the same pair are summed first. Stored values are clamped to
+    [REPUTATION_MIN, REPUTATION_MAX] in SQL.
+    """
+    combined = Counter()
+    for character_id, npc_id, delta in deltas:
+        combined[(character_id, npc_id)] += delta
+    rows = [(character_id, npc_id, _clamp_delta(delta)) for (character_id, npc_id), delta in combined.items() if delta]
+    if not rows:
+        return
+
+    # Existing rows are clamped by the upsert itself. A new row stores the raw
+    # delta, so only a delta outside the bounds needs a follow-up UPDATE.
+    insert_or_add(CharacterReputation, ("character", "npc"), "reputation", rows, bounds=(REPUTATION_MIN, REPUTATION_MAX))
+    if any(not REPUTATION_MIN <= delta <= REPUTATION_MAX for _, _, delta in rows):
+        CharacterReputation.objects.filter(
+            Q(reputation__lt=REPUTATION_MIN) | Q(reputation__gt=REPUTATION_MAX),
+            character_id__in={row[0] for row in rows},
+            npc_id__in={row[1] for row in rows},
+        ).update(reputation=Greatest(Value(REPUTATION_MIN), Least(Value(REPUTATION_MAX), F("reputation"))))
+
+    keys = [VECTOR_KEY.format(character_id=character_id) for character_id in {row[0] for row in rows}]
+    cache.delete_many(keys)
+    # Again after commit, in case a reader cached the old values in between
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def adjust_players(npc, deltas):
+    """Change the standing of many players with one NPC. ``deltas`` maps player id -> delta."""
+    npc_id = getattr(npc, "pk", npc)
+    apply_deltas((player_id, npc_id, delta) for player_id, delta in deltas.items())
+
+
+def adjust_faction(player, deltas):
+    """Change one player's standing with many NPCs. ``deltas`` maps NPC id -> delta."""
+    player_id = getattr(player, "pk", player)
+    apply_deltas((player_id, npc_id, delta) for npc_id, delta in deltas.items())
+
+
+def get_reputation_vector(character):
+    """The character's standing with every NPC they have met, as a dict of NPC id -> reputation."""
+    character_id = getattr(character, "pk", character)
+    key = VECTOR_KEY.format(character_id=character_id)
+    vector = cache.get(key)
+    if vector is None:
+        vector = dict(CharacterReputation.objects.filter(character_id=character_id).values_list("npc_id", "reputation"))
+        cache.set(key, vector, CACHE_SECONDS)
+    return vector
+
+
+def get_reputation(character, npc):
+    return get_reputation_vector(character).get(getattr(npc, "pk", npc), 0)
@@ -0,0 +1,85 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from . import snapshots
+from .inventory import grant_items
+from .models import Character, CharacterMission
+
+XP_PER_LEVEL = 100
+
+
+def level_for_xp(xp):
+    """Level reached with ``xp`` experience. Works on ints and on SQL expressions."""
+    return xp // XP_PER_LEVEL + 1 if isinstance(xp, int) else xp / Value(XP_PER_LEVEL) + Value(1)
+
+
+def settle_mission_rewards(character_mission):
+    """
+    Pay out the rewards of a single completed mission.
+
+    Returns False if the mission is not completed or was already paid out.
+    """
+    with transaction.atomic(savepoint=False):
+        claimed = CharacterMission.objects.filter(
+            pk=character_mission.pk, completed=True, rewarded=False
+        ).update(rewarded=True)
+        if not claimed:
+            return False
+        character_mission.rewarded = True
+        mission = character_mission.mission
+        _credit([(character_mission.character_id, mission.reward_gold, mission.reward_xp, mission.reward_item_id)])
+    return True
+
+
+def settle_rewards(queryset=None, batch_size=500):
+    """
+    Pay out every completed, unpaid mission in ``queryset`` in batches.
+
+    Each batch claims its rows with SELECT ... FOR UPDATE SKIP LOCKED, so
+    several workers can settle the same backlog without paying twice.
+    Returns the number of missions settled.
+    """
+    if queryset is None:
+        queryset = CharacterMission.objects.all()
+    pending = queryset.filter(completed=True, rewarded=False).order_by("pk")
+
+    settled = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                pending.select_for_update(skip_locked=True, of=("self",))
+                .values_list("pk", "character_id", "mission__reward_gold", "mission__reward_xp", "mission__reward_item_id")
+                [:batch_size]
+            )
+            if not rows:
+                return settled
+            CharacterMission.objects.filter(pk__in=[row[0] for row in rows]).update(rewarded=True)
+            _credit([row[1:] for row in rows])
+        settled += len(rows)
+
+
+def _credit(rewards):
+    """Apply ``(character_id, gold, xp, item_id)`` rewards with one UPDATE plus one inventory grant."""
+    totals = defaultdict(lambda: [0, 0])
+    items = Counter()
+    for character_id, gold, xp, item_id in rewards:
+        totals[character_id][0] += gold
+        totals[character_id][1] += xp
+        if item_id:
+            items[(character_id, item_id)] += 1
+
+    totals = {character_id: amounts for character_id, amounts in totals.items() if any(amounts)}
+    if totals:
+        gold = Case(*[When(pk=pk, then=Value(g)) for pk, (g, _) in totals.items()], default=Value(0))
+        xp = Case(*[When(pk=pk, then=Value(x)) for pk, (_, x) in totals.items()], default=Value(0))
+        Character.objects.filter(pk__in=totals).update(
+            gold=F("gold") + gold,
+            xp=F("xp") + xp,
+            level=Greatest(F("level"), level_for_xp(F("xp") + xp)),
+        )
+        snapshots.touch(*totals)
+
+    grant_items(items)
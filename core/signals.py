@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import catalog, presence, snapshots
+from .models import (
+    Character, CharacterLocation, CharacterMission, CharacterMissionProgress, CharacterStats, InventoryItem, MissionStep,
+)
+
+
+def invalidate_catalog(sender, **kwargs):
+    catalog.invalidate()
+
+
+# Connected per model: a sender-less delete receiver would make Django
+# fetch rows before every queryset delete in the project.
+for model in catalog.CATALOG_MODELS:
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f"catalog-save-{model._meta.label}")
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f"catalog-delete-{model._meta.label}")
+
+
+# Presence lives in the cache, outside the transaction: it follows a move
+# only once the move is committed.
+def update_presence(sender, instance, **kwargs):
+    transaction.on_commit(lambda: presence.character_moved(instance))
+
+
+def clear_presence(sender, instance, **kwargs):
+    character_id = instance.character_id
+    transaction.on_commit(lambda: presence.character_left(character_id))
+
+
+post_save.connect(update_presence, sender=CharacterLocation, dispatch_uid="presence-save")
+post_delete.connect(clear_presence, sender=CharacterLocation, dispatch_uid="presence-delete")
+
+
+def touch_character(sender, instance, **kwargs):
+    snapshots.touch(instance.pk)
+
+
+def touch_owner(sender, instance, **kwargs):
+    snapshots.touch(instance.character_id)
+
+
+def touch_mission_owner(sender, instance, **kwargs):
+    if CharacterMissionProgress.character_mission.is_cached(instance):
+        character_id = instance.character_mission.character_id
+    else:
+        character_id = (
+            CharacterMission.objects.filter(pk=instance.character_mission_id)
+            .values_list("character_id", flat=True).first()
+        )
+    snapshots.touch(character_id)
+
+
+# Everything shown in the character snapshot; see core.snapshots.
+for model, receiver in (
+    (Character, touch_character),
+    (CharacterStats, touch_owner),
+    (InventoryItem, touch_owner),
+    (CharacterLocation, touch_owner),
+    (CharacterMission, touch_owner),
+    (CharacterMissionProgress, touch_mission_owner),
+):
+    post_save.connect(receiver, sender=model, dispatch_uid=f"snapshot-save-{model._meta.label}")
+    post_delete.connect(receiver, sender=model, dispatch_uid=f"snapshot-delete-{model._meta.label}")
+
+
+# The next-command index of CharacterMission follows progress saves and step
+# edits in save(); deletions (often cascades or queryset deletes) come here.
+def refresh_step_missions(sender, instance, **kwargs):
+    instance.refresh_open_missions()
+
+
+def refresh_progress_mission(sender, instance, **kwargs):
+    CharacterMission.refresh_next_steps(CharacterMission.objects.filter(pk=instance.character_mission_id))
+
+
+post_delete.connect(refresh_step_missions, sender=MissionStep, dispatch_uid="next-command-step-delete")
+post_delete.connect(refresh_progress_mission, sender=CharacterMissionProgress, dispatch_uid="next-command-progress-delete")
@@ -0,0 +1,61 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Per-character version stamps for the character snapshot (stats, inventory,
+# location and mission progress). Every write to those tables bumps the
+# character's version, so a version identifies one state of the snapshot.
+# Writes that go through save()/delete() are covered by core.signals; the
+# services that write with update() or raw SQL call touch() themselves.
+# The versions are only right if every worker shares the cache, which
+# core.checks requires (core.E002) when there is more than one.
+VERSION_KEY = "core:snapshot:version:{}"
+PAYLOAD_KEY = "core:snapshot:{}:{}"
+PAYLOAD_TTL_SECONDS = 600
+
+
+def get_version(character_id):
+    key = VERSION_KEY.format(character_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never comes back with a
+        # value some client already holds an ETag for.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def touch(*character_ids):
+    """
+    Bump the version of every given character, now and again on commit.
+
+    The first bump stops serving the old snapshot; the second one discards
+    any snapshot rebuilt from pre-commit data while the transaction was open.
+    """
+    character_ids = {character_id for character_id in character_ids if character_id is not None}
+    if not character_ids:
+        return
+    _bump(character_ids)
+    transaction.on_commit(lambda: _bump(character_ids))
+
+
+def _bump(character_ids):
+    for character_id in character_ids:
+        key = VERSION_KEY.format(character_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def etag(character_id, version):
+    return f'"{character_id}-{version}"'
+
+
+def get_payload(character_id, version):
+    return cache.get(PAYLOAD_KEY.format(character_id, version))
+
+
+def set_payload(character_id, version, payload):
+    cache.set(PAYLOAD_KEY.format(character_id, version), payload, PAYLOAD_TTL_SECONDS)
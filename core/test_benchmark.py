@@ -0,0 +1,25 @@
+from unittest import skipIf
+
+from django.test import TestCase
+from core import benchmark
+from core.models import Character
+
+
+class BenchmarkTest(TestCase):
+    @skipIf(benchmark.load_baseline() is None, "no benchmark baseline for this database")
+    def test_query_counts_do_not_regress(self):
+        # Query counts do not depend on the number of repetitions, and
+        # timings are too noisy to assert on here: see the benchmark command.
+        results = benchmark.run(repeat=1)
+        self.assertEqual(set(results), set(benchmark.OPERATIONS))
+        self.assertEqual(benchmark.compare(results, benchmark.load_baseline(), check_time=False), [])
+
+    def test_compare_tolerates_noise_but_not_extra_queries(self):
+        baseline = {"results": {"op": {"queries": 4, "time_ms": 10.0, "alloc_kb": 100.0}}}
+        self.assertEqual(benchmark.compare({"op": {"queries": 4, "time_ms": 15.0, "alloc_kb": 120.0}}, baseline), [])
+        self.assertEqual(len(benchmark.compare({"op": {"queries": 5, "time_ms": 10.0, "alloc_kb": 100.0}}, baseline)), 1)
+        self.assertEqual(len(benchmark.compare({"op": {"queries": 4, "time_ms": 40.0, "alloc_kb": 400.0}}, baseline)), 2)
+
+    def test_run_leaves_nothing_behind(self):
+        benchmark.run(repeat=1, only=["loot.random_for_ruin"])
+        self.assertFalse(Character.objects.exists())
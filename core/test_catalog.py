@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from core import catalog
+from core.models import Item, Rarity, Ruin, RuinItemDrop
+
+
+class CatalogTest(TestCase):
+    def setUp(self):
+        self.rarity = Rarity.objects.create(name="Epic", color_code="#A335EE")
+        self.item = Item.objects.create(name="Lantern", rarity=self.rarity)
+        self.ruin = Ruin.objects.create(name="Crypt", description="Dark.")
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.item, drop_chance=0.5)
+
+    def test_lookups_do_not_query_once_loaded(self):
+        catalog.get_catalog()
+        with self.assertNumQueries(0):
+            item = catalog.get_item(self.item.pk)
+            self.assertEqual(item.rarity.name, "Epic")
+            self.assertEqual(catalog.get_rarity(self.rarity.pk), self.rarity)
+            self.assertEqual([drop.item for drop in catalog.get_ruin_drops(self.ruin.pk)], [self.item])
+
+    def test_saving_catalog_rows_invalidates(self):
+        catalog.get_catalog()
+        self.item.name = "Old Lantern"
+        self.item.save()
+        self.assertEqual(catalog.get_item(self.item.pk).name, "Old Lantern")
+
+
+class CatalogCommitTest(TransactionTestCase):
+    # Which catalog is kept depends on the transaction committing
+    def setUp(self):
+        self.item = Item.objects.create(name="Lantern")
+
+    def test_rolled_back_rows_are_not_kept(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            ghost = Item.objects.create(name="Ghost Lantern")
+            self.assertEqual(catalog.get_item(ghost.pk), ghost)
+            raise ValueError
+        self.assertIsNone(catalog.get_item(ghost.pk))
+
+    def test_rolled_back_savepoint_rows_are_not_kept(self):
+        with transaction.atomic():
+            catalog.get_catalog()
+            with self.assertRaises(ValueError), transaction.atomic():
+                ghost = Item.objects.create(name="Ghost Lantern")
+                self.assertEqual(catalog.get_item(ghost.pk), ghost)
+                raise ValueError
+            self.assertIsNone(catalog.get_item(ghost.pk))
+        self.assertIsNone(catalog.get_item(ghost.pk))
+
+    def test_other_workers_pick_up_version_bumps(self):
+        loaded = catalog.get_catalog()
+        Item.objects.filter(pk=self.item.pk).update(name="Renamed elsewhere")
+        cache.incr(catalog.VERSION_KEY)
+        catalog._local["checked_at"] = 0.0
+        self.assertIsNot(catalog.get_catalog(), loaded)
+        self.assertEqual(catalog.get_item(self.item.pk).name, "Renamed elsewhere")
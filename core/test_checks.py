@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase, override_settings
+from core.checks import shared_state_errors
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SHARED_CACHE = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+
+
+@override_settings(COMMAND_RATE_LIMIT_BACKEND="core.ratelimit.CacheBackend")
+class SharedStateCheckTest(SimpleTestCase):
+    @override_settings(CACHES=LOCAL_CACHE, PUBSUB_BROKER="core.pubsub.LocalBroker")
+    def test_one_worker_may_keep_state_in_process(self):
+        self.assertEqual(shared_state_errors(1), [])
+
+    @override_settings(CACHES=SHARED_CACHE, PUBSUB_BROKER="core.pubsub.LocalBroker")
+    def test_several_workers_need_a_shared_broker(self):
+        self.assertEqual([error.id for error in shared_state_errors(4)], ["core.E001"])
+
+    @override_settings(CACHES=LOCAL_CACHE, PUBSUB_BROKER="core.pubsub.RedisBroker")
+    def test_several_workers_need_a_shared_cache(self):
+        self.assertEqual([error.id for error in shared_state_errors(4)], ["core.E002"])
+
+    @override_settings(
+        CACHES=SHARED_CACHE, PUBSUB_BROKER="core.pubsub.RedisBroker", COMMAND_RATE_LIMIT_BACKEND="core.ratelimit.LocalBackend"
+    )
+    def test_several_workers_need_a_shared_rate_limit(self):
+        self.assertEqual([error.id for error in shared_state_errors(4)], ["core.E003"])
+
+    @override_settings(CACHES=SHARED_CACHE, PUBSUB_BROKER="core.pubsub.RedisBroker")
+    def test_shared_services_pass(self):
+        self.assertEqual(shared_state_errors(4), [])
@@ -0,0 +1,51 @@
+from django.test import TestCase
+from core.crafting import CraftingError, craft, craft_batch, craft_max
+from core.models import Character, InventoryItem, Item, Recipe, RecipeIngredient
+
+
+class CraftingTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Smith")
+        self.ore = Item.objects.create(name="Iron Ore")
+        self.wood = Item.objects.create(name="Wood")
+        self.sword = Item.objects.create(name="Iron Sword", craftable=True)
+        self.torch = Item.objects.create(name="Torch", craftable=True)
+        self.sword_recipe = Recipe.objects.create(name="Sword", description="", result=self.sword)
+        RecipeIngredient.objects.create(recipe=self.sword_recipe, item=self.ore, quantity=3)
+        RecipeIngredient.objects.create(recipe=self.sword_recipe, item=self.wood, quantity=1)
+        self.torch_recipe = Recipe.objects.create(name="Torch", description="", result=self.torch)
+        RecipeIngredient.objects.create(recipe=self.torch_recipe, item=self.wood, quantity=2)
+        InventoryItem.objects.create(character=self.character, item=self.ore, quantity=7)
+        InventoryItem.objects.create(character=self.character, item=self.wood, quantity=5)
+
+    def quantity(self, item):
+        row = InventoryItem.objects.filter(character=self.character, item=item).first()
+        return row.quantity if row else 0
+
+    def test_craft_consumes_and_grants(self):
+        craft(self.character, self.sword_recipe)
+        self.assertEqual(self.quantity(self.ore), 4)
+        self.assertEqual(self.quantity(self.wood), 4)
+        self.assertEqual(self.quantity(self.sword), 1)
+
+    def test_short_ingredients_change_nothing(self):
+        with self.assertRaises(CraftingError):
+            craft(self.character, self.sword_recipe, times=3)
+        self.assertEqual(self.quantity(self.ore), 7)
+        self.assertEqual(self.quantity(self.sword), 0)
+
+    def test_craft_max(self):
+        self.assertEqual(craft_max(self.character, self.sword_recipe), 2)
+        self.assertEqual(self.quantity(self.ore), 1)
+        self.assertEqual(self.quantity(self.wood), 3)
+        self.assertEqual(self.quantity(self.sword), 2)
+
+    def test_batch_is_all_or_nothing(self):
+        with self.assertRaises(CraftingError):
+            craft_batch(self.character, [(self.sword_recipe, 2), (self.torch_recipe, 2)])
+        self.assertEqual(self.quantity(self.wood), 5)
+
+        crafted = craft_batch(self.character, [(self.sword_recipe, 1), (self.torch_recipe, 2)])
+        self.assertEqual(crafted, {self.sword.pk: 1, self.torch.pk: 2})
+        self.assertEqual(self.quantity(self.wood), 0)
+        self.assertFalse(InventoryItem.objects.filter(character=self.character, item=self.wood).exists())
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from core.energy import current_energy, spend_energy
+from core.models import Character
+
+
+@override_settings(ENERGY_MAX=100, ENERGY_REGEN_SECONDS=60)
+class EnergyTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Runner", energy=10, energy_updated_at=now() - timedelta(minutes=30))
+
+    def test_regenerates_on_read(self):
+        # 30 minutes cross 30 or 31 tick boundaries depending on the second we start at
+        self.assertIn(self.character.current_energy, (40, 41))
+        self.assertEqual(current_energy(self.character, now() + timedelta(days=1)), 100)
+
+    def test_above_cap_does_not_regenerate(self):
+        self.character.energy = 150
+        self.assertEqual(self.character.current_energy, 150)
+
+    def test_spend_is_one_conditional_update(self):
+        expected = self.character.current_energy - 25
+        with self.assertNumQueries(1):
+            self.assertTrue(spend_energy(self.character, 25))
+        self.assertEqual(self.character.energy, expected)
+
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.current_energy, expected)
+
+    def test_cannot_overdraw(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(spend_energy(self.character, 60))
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.energy, 10)
+
+    def test_idle_characters_are_not_written(self):
+        stamp = self.character.energy_updated_at
+        self.character.current_energy
+        self.character.refresh_from_db()
+        self.assertEqual((self.character.energy, self.character.energy_updated_at), (10, stamp))
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponseServerError
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.timezone import now
+from core.events import buffered_events
+from core.middleware import EventLogBufferMiddleware
+from core.models import Character, EventLog, EventLogArchive
+
+
+class EventBufferTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Bard")
+
+    def test_buffered_events_are_written_in_one_insert(self):
+        with self.assertNumQueries(1):
+            with buffered_events():
+                for i in range(4):
+                    EventLog.log(self.character, f"verse {i}")
+                with buffered_events():
+                    EventLog.log(self.character, "chorus")
+        self.assertEqual(EventLog.objects.filter(character=self.character).count(), 5)
+
+    def test_events_are_dropped_when_block_fails(self):
+        with self.assertRaises(ValueError):
+            with buffered_events():
+                EventLog.log(self.character, "never sung")
+                raise ValueError
+        self.assertFalse(EventLog.objects.exists())
+
+    def test_failed_nested_block_drops_only_its_events(self):
+        with buffered_events():
+            EventLog.log(self.character, "sung")
+            try:
+                with transaction.atomic(), buffered_events():
+                    EventLog.log(self.character, "never sung")
+                    raise ValueError
+            except ValueError:
+                pass
+            EventLog.log(self.character, "encore")
+        self.assertEqual(list(EventLog.objects.order_by("pk").values_list("message", flat=True)), ["sung", "encore"])
+
+    def test_events_are_written_in_the_transaction_that_logs_them(self):
+        with buffered_events():
+            with transaction.atomic(), buffered_events():
+                EventLog.log(self.character, "committed")
+            self.assertEqual(EventLog.objects.count(), 1)
+            try:
+                with transaction.atomic():
+                    EventLog.log(self.character, "rolled back")
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(list(EventLog.objects.values_list("message", flat=True)), ["committed"])
+
+    def test_middleware_keeps_committed_events_of_failed_requests(self):
+        def view(request):
+            with transaction.atomic(), buffered_events():
+                EventLog.log(self.character, "done")
+            EventLog.log(self.character, "then it broke")
+            return HttpResponseServerError()
+
+        EventLogBufferMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(EventLog.objects.count(), 2)
+
+    @override_settings(EVENT_LOG_BUFFER_SIZE=2)
+    def test_buffer_flushes_on_size_threshold(self):
+        with buffered_events():
+            EventLog.log(self.character, "one")
+            EventLog.log(self.character, "two")
+            self.assertEqual(EventLog.objects.count(), 2)
+            EventLog.log(self.character, "three")
+            self.assertEqual(EventLog.objects.count(), 2)
+        self.assertEqual(EventLog.objects.count(), 3)
+
+    @override_settings(EVENT_LOG_SYNC=True)
+    def test_sync_mode_writes_immediately(self):
+        with buffered_events():
+            EventLog.log(self.character, "now")
+            self.assertEqual(EventLog.objects.count(), 1)
+
+
+class ArchiveEventsCommandTest(TestCase):
+    def test_old_events_are_packed_into_archive(self):
+        character = Character.objects.create(name="Elder")
+        old = now() - timedelta(days=200)
+        EventLog.objects.bulk_create(
+            [EventLog(character=character, message=f"old {i}", timestamp=old + timedelta(minutes=i)) for i in range(5)]
+            + [EventLog(character=character, message="recent")]
+        )
+
+        call_command("archive_events", days=90, chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(list(EventLog.objects.values_list("message", flat=True)), ["recent"])
+        archives = EventLogArchive.objects.filter(character=character).order_by("period_start")
+        self.assertEqual(sum(archive.count for archive in archives), 5)
+        self.assertEqual(
+            [message for archive in archives for _, message in archive.events],
+            [f"old {i}" for i in range(5)],
+        )
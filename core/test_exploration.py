@@ -0,0 +1,59 @@
+import random
+
+from django.test import TestCase, override_settings
+from core.catalog import get_catalog
+from core.exploration import ExplorationError, explore, explore_party
+from core.inventory import get_inventory
+from core.models import Character, EventLog, Item, Ruin, RuinItemDrop
+
+
+@override_settings(ENERGY_MAX=100)
+class ExplorationTest(TestCase):
+    def setUp(self):
+        self.ruin = Ruin.objects.create(name="Sunken Vault", description="Wet.", required_level=2, unlocked=True, energy_cost=30)
+        self.coin = Item.objects.create(name="Coin")
+        self.crown = Item.objects.create(name="Crown")
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.coin, drop_chance=1.0)
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.crown, drop_chance=0.0)
+        self.character = Character.objects.create(name="Delver", level=2, energy=100)
+        get_catalog()
+
+    # Counts include the savepoint queries the test transaction adds around atomic()
+
+    def test_explore_in_three_statements(self):
+        with self.assertNumQueries(5):
+            found = explore(self.character, self.ruin, random.Random(1))
+        self.assertEqual(found, {self.coin.pk: 1})
+        self.assertEqual(get_inventory(self.character), {self.coin.pk: 1})
+        self.assertEqual(self.character.energy, 70)
+        self.assertEqual(
+            EventLog.objects.get(character=self.character).message,
+            "Delver explored Sunken Vault and found 1 x Coin",
+        )
+
+    def test_level_and_energy_are_checked_by_the_update(self):
+        novice = Character.objects.create(name="Novice", level=1, energy=100)
+        tired = Character.objects.create(name="Tired", level=5, energy=10)
+        for character in (novice, tired):
+            with self.assertNumQueries(4), self.assertRaises(ExplorationError):
+                explore(character, self.ruin)
+        self.assertFalse(EventLog.objects.exists())
+        self.assertEqual(Character.objects.get(pk=tired.pk).energy, 10)
+
+    def test_sealed_ruins_cannot_be_explored(self):
+        self.ruin.unlocked = False
+        with self.assertNumQueries(0), self.assertRaises(ExplorationError):
+            explore(self.character, self.ruin)
+
+    def test_party_explores_in_one_pass(self):
+        party = [Character.objects.create(name=f"Member {i}", level=3, energy=100) for i in range(10)]
+        party.append(Character.objects.create(name="Straggler", level=3, energy=5))
+        # lock, energy update, inventory upsert, event insert
+        with self.assertNumQueries(6):
+            results = explore_party(party, self.ruin, random.Random(2))
+
+        self.assertEqual(len(results), 10)
+        self.assertNotIn(party[-1].pk, results)
+        self.assertEqual(Character.objects.filter(energy=70).count(), 10)
+        self.assertEqual(get_inventory(party[0]), {self.coin.pk: 1})
+        self.assertEqual(EventLog.objects.count(), 11)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from core import friends
+from core.models import Character, Friendship
+
+
+class FriendsTest(TestCase):
+    def setUp(self):
+        self.a, self.b, self.c, self.d, self.e = [Character.objects.create(name=name) for name in "ABCDE"]
+
+    def befriend(self, x, y):
+        friends.send_request(x, y)
+        friends.accept(y, x)
+
+    def test_requests_are_symmetric_and_unique(self):
+        friends.send_request(self.a, self.b)
+        self.assertFalse(friends.are_friends(self.b, self.a))
+        with self.assertRaises(friends.FriendshipError):
+            friends.send_request(self.a, self.b)
+
+        # B asking back accepts the pending request instead of adding a row
+        friends.send_request(self.b, self.a)
+        self.assertTrue(friends.are_friends(self.b, self.a))
+        self.assertEqual(Friendship.objects.count(), 1)
+        with self.assertRaises(friends.FriendshipError):
+            friends.send_request(self.a, self.a)
+
+    def test_batch_lookups(self):
+        self.befriend(self.a, self.b)
+        self.befriend(self.c, self.a)
+        friends.send_request(self.a, self.d)
+        self.assertEqual(friends.friend_ids(self.a), {self.b.pk, self.c.pk})
+        with self.assertNumQueries(1):
+            self.assertEqual(friends.friends_among(self.a, [self.b, self.c, self.d, self.e]), {self.b.pk, self.c.pk})
+
+    def test_friends_of_friends_suggestions(self):
+        self.befriend(self.a, self.b)
+        self.befriend(self.a, self.c)
+        self.befriend(self.b, self.d)
+        self.befriend(self.c, self.d)
+        self.befriend(self.e, self.c)
+        self.befriend(self.b, self.c)
+
+        suggested = friends.suggestions(self.a)
+        self.assertEqual(
+            [(row["character_id"], row["mutual_friends"]) for row in suggested],
+            [(self.d.pk, 2), (self.e.pk, 1)],
+        )
+        self.assertEqual(suggested[0]["name"], "D")
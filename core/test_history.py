@@ -0,0 +1,44 @@
+from django.test import TestCase, override_settings
+from core.history import get_history, run_command
+from core.models import Character, CommandHistory, EventLog, TextCommand
+
+
+@override_settings(COMMAND_HISTORY_SIZE=3)
+class CommandHistoryTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Chatterbox")
+        self.other = Character.objects.create(name="Quiet")
+
+    def test_ring_keeps_the_last_commands_in_place(self):
+        for i in range(7):
+            run_command(self.character, f"say {i}")
+        run_command(self.other, "hello")
+
+        self.assertEqual(get_history(self.character), ["say 6", "say 5", "say 4"])
+        self.assertEqual(get_history(self.other), ["hello"])
+        self.assertEqual(CommandHistory.objects.filter(character=self.character).count(), 3)
+        self.assertFalse(TextCommand.objects.exists())
+        self.assertFalse(EventLog.objects.filter(message__contains="executed command").exists())
+
+    def test_ring_write_is_one_statement(self):
+        run_command(self.character, "warm up")
+        with self.assertNumQueries(3):
+            # ring write, mission lookup, fallback event
+            command = run_command(self.character, "look")
+        self.assertIsNone(command.pk)
+        self.assertIsNotNone(command.created_at)
+
+    def test_model_api_always_stores_the_command(self):
+        command = TextCommand.objects.create(character=self.character, command="look")
+        self.assertIsNotNone(command.pk)
+        self.assertTrue(EventLog.objects.filter(message="Chatterbox executed command: 'look'").exists())
+        self.assertFalse(CommandHistory.objects.exists())
+
+    @override_settings(COMMAND_HISTORY_MODE="audit")
+    def test_audit_mode_stores_every_command(self):
+        for i in range(5):
+            run_command(self.character, f"say {i}")
+        self.assertEqual(TextCommand.objects.count(), 5)
+        self.assertEqual(EventLog.objects.filter(message__contains="executed command").count(), 5)
+        self.assertEqual(get_history(self.character), ["say 4", "say 3", "say 2"])
+        self.assertFalse(CommandHistory.objects.exists())
@@ -0,0 +1,103 @@
+from django.db import connection
+from django.test import TestCase
+from core.benchmark import seed
+from core.models import (
+    Auction, CharacterMission, CharacterMissionProgress, EventLog, InventoryItem, Item, TextCommand,
+)
+
+# The plain index Django adds for CharacterMission.character. Lookups
+# scoped to one character's handful of missions may use it instead of the
+# partial index, which is just as good.
+CHARACTER_FK_INDEX = "core_charactermission_character_id"
+
+
+class HotQueryIndexTest(TestCase):
+    """
+    EXPLAIN the hot ORM queries on a seeded world and check each one is
+    served by an index meant for it. Postgres is told to avoid sequential
+    and bitmap scans, which on tables this small it would rightly prefer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        world = seed(characters=20, missions=5, steps=4, drops=10, events=5)
+        characters = world["characters"]
+        cls.character = characters[0]
+        cls.mission = CharacterMission.objects.filter(character=cls.character).first()
+        items = list(Item.objects.filter(name__startswith="Bench Item"))
+        cls.item = items[0]
+        InventoryItem.objects.bulk_create([InventoryItem(character=c, item=item, quantity=1) for c in characters for item in items])
+        Auction.objects.bulk_create([
+            Auction(seller=c, item=item, price=10 + i) for i, c in enumerate(characters) for item in items
+        ])
+        TextCommand.objects.bulk_create([TextCommand(character=c, command="look") for c in characters])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    def assertUsesIndex(self, queryset, *indexes):
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":
+            self.assertIn("Index", plan)
+        elif connection.vendor == "sqlite":
+            self.assertRegex(plan, r"USING (COVERING )?INDEX")
+        self.assertTrue(any(index in plan for index in indexes), plan)
+
+    def assertUsesUnique(self, queryset, constraint):
+        # SQLite builds unique constraints into the table as automatic indexes
+        self.assertUsesIndex(queryset, constraint, f"sqlite_autoindex_{queryset.model._meta.db_table}")
+
+    def test_text_command_lookup(self):
+        self.assertUsesIndex(
+            CharacterMission.objects.filter(
+                character=self.character, completed=False, next_command__in=["search mission 0 step 1", "look"]
+            ).order_by("pk"),
+            "charmission_open_command_idx", CHARACTER_FK_INDEX,
+        )
+
+    def test_active_missions(self):
+        self.assertUsesIndex(
+            CharacterMission.objects.filter(character__in=[self.character], completed=False),
+            "charmission_open_command_idx", CHARACTER_FK_INDEX,
+        )
+
+    def test_unrewarded_missions(self):
+        self.assertUsesIndex(
+            CharacterMission.objects.filter(completed=True, rewarded=False).order_by("pk"),
+            "charmission_unrewarded_idx",
+        )
+
+    def test_step_progress(self):
+        self.assertUsesUnique(
+            CharacterMissionProgress.objects.filter(character_mission=self.mission, step=self.mission.next_step_id, completed=False),
+            "unique_mission_progress_step",
+        )
+
+    def test_event_feed(self):
+        self.assertUsesIndex(
+            EventLog.objects.filter(character=self.character).order_by("-timestamp", "-id")[:20],
+            "eventlog_character_feed_idx",
+        )
+
+    def test_order_book(self):
+        self.assertUsesIndex(
+            Auction.objects.filter(status=Auction.ACTIVE, item=self.item).order_by("price", "created_at", "pk")[:20],
+            "auction_active_item_price_idx",
+        )
+
+    def test_inventory_stack(self):
+        self.assertUsesUnique(
+            InventoryItem.objects.filter(character=self.character, item=self.item),
+            "unique_inventory_stack",
+        )
+
+    def test_audit_history(self):
+        self.assertUsesIndex(
+            TextCommand.objects.filter(character=self.character).order_by("-created_at", "-pk")[:50],
+            "textcommand_recent_idx",
+        )
@@ -0,0 +1,27 @@
+from django.db import IntegrityError
+from django.test import TestCase
+from core.inventory import get_inventory, grant_item, grant_items
+from core.models import Character, InventoryItem, Item
+
+
+class InventoryTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Hoarder")
+        self.other = Character.objects.create(name="Collector")
+        self.items = [Item.objects.create(name=f"Trinket {i}") for i in range(50)]
+
+    def test_grants_stack_in_one_statement(self):
+        grant_item(self.character, self.items[0], 2)
+        grants = {(character.pk, item.pk): 3 for character in (self.character, self.other) for item in self.items}
+        with self.assertNumQueries(1):
+            grant_items(grants)
+
+        self.assertEqual(InventoryItem.objects.count(), 100)
+        inventory = get_inventory(self.character)
+        self.assertEqual(inventory[self.items[0].pk], 5)
+        self.assertEqual(inventory[self.items[1].pk], 3)
+
+    def test_duplicate_stacks_are_rejected(self):
+        InventoryItem.objects.create(character=self.character, item=self.items[0])
+        with self.assertRaises(IntegrityError):
+            InventoryItem.objects.create(character=self.character, item=self.items[0])
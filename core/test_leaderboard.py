@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase
+from core import leaderboard
+from core.market import record_sale
+from core.models import AuctionReputation, Character
+
+
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sellers = [Character.objects.create(name=f"Seller {i}") for i in range(4)]
+        for seller, sales in zip(self.sellers, [1, 3, 2, 3]):
+            for _ in range(sales):
+                record_sale(seller.pk, 10 * (seller.pk % 5))
+
+    def test_sales_update_a_single_row(self):
+        self.assertEqual(AuctionReputation.objects.filter(character=self.sellers[1]).count(), 1)
+        reputation = AuctionReputation.objects.get(character=self.sellers[1])
+        self.assertEqual(reputation.total_sales, 3)
+        with self.assertRaises(IntegrityError):
+            AuctionReputation.objects.create(character=self.sellers[1])
+
+    def test_top_and_rank(self):
+        entries = leaderboard.top(3)
+        self.assertEqual([entry["rank"] for entry in entries], [1, 2, 3])
+        self.assertEqual(
+            [entry["character_id"] for entry in entries[:2]],
+            [seller.pk for seller in sorted(self.sellers[1::2], key=lambda s: -(s.pk % 5))],
+        )
+        self.assertEqual(leaderboard.rank_of(self.sellers[0])["rank"], 4)
+        self.assertIsNone(leaderboard.rank_of(Character.objects.create(name="Newcomer")))
+
+    def test_rank_matches_the_board(self):
+        record_sale(self.sellers[0].pk, 0)  # as many sales as the third seller
+        for entry in leaderboard.top(4):
+            with self.assertNumQueries(1):
+                self.assertEqual(leaderboard.rank_of(entry["character_id"]), entry)
+
+    def test_reads_are_cached(self):
+        leaderboard.top(3)
+        leaderboard.rank_of(self.sellers[2])
+        with self.assertNumQueries(0):
+            leaderboard.top(3)
+            leaderboard.rank_of(self.sellers[2])
@@ -0,0 +1,42 @@
+import random
+
+from django.test import TestCase
+from core.loot import LootTable, make_rng
+from core.models import Item, Ruin, RuinItemDrop
+
+
+class LootTableTest(TestCase):
+    def setUp(self):
+        self.ruin = Ruin.objects.create(name="Sunken Vault", description="Wet.")
+        self.always = Item.objects.create(name="Coin")
+        self.never = Item.objects.create(name="Crown")
+        self.sometimes = Item.objects.create(name="Gem")
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.always, drop_chance=1.0)
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.never, drop_chance=0.0)
+        RuinItemDrop.objects.create(ruin=self.ruin, item=self.sometimes, drop_chance=0.25)
+
+    def test_table_is_cached_until_drops_change(self):
+        LootTable.for_ruin(self.ruin)
+        with self.assertNumQueries(0):
+            LootTable.for_ruin(self.ruin)
+
+        RuinItemDrop.objects.filter(item=self.never).get().delete()
+        self.assertNotIn(self.never.pk, LootTable.for_ruin(self.ruin).item_ids)
+
+    def test_roll_many_aggregates_counts(self):
+        counts = LootTable.for_ruin(self.ruin).roll_many(1000, make_rng(7))
+        self.assertEqual(counts[self.always.pk], 1000)
+        self.assertNotIn(self.never.pk, counts)
+        self.assertTrue(150 < counts[self.sometimes.pk] < 350)
+
+    def test_rolls_are_reproducible_with_a_seed(self):
+        table = LootTable.for_ruin(self.ruin)
+        self.assertEqual(table.roll_many(500, make_rng(42)), table.roll_many(500, make_rng(42)))
+        self.assertEqual(table.roll_each(20, random.Random(3)), table.roll_each(20, random.Random(3)))
+
+    def test_roll_each_returns_one_result_per_exploration(self):
+        results = LootTable.for_ruin(self.ruin).roll_each(10, random.Random(1))
+        self.assertEqual(len(results), 10)
+        for loot in results:
+            self.assertEqual(loot[self.always.pk], 1)
+            self.assertNotIn(self.never.pk, loot)
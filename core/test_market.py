@@ -0,0 +1,49 @@
+from django.test import TestCase
+from core.inventory import get_inventory, grant_item
+from core.market import MarketError, buy, cancel_listing, list_item, order_book, search
+from core.models import Auction, AuctionReputation, Character, Item, Rarity
+
+
+class MarketTest(TestCase):
+    def setUp(self):
+        self.seller = Character.objects.create(name="Merchant", gold=0)
+        self.buyer = Character.objects.create(name="Customer", gold=100)
+        self.rare = Rarity.objects.create(name="Rare", color_code="#0070DD")
+        self.potion = Item.objects.create(name="Potion", rarity=self.rare)
+        grant_item(self.seller, self.potion, 5)
+
+    def test_listing_moves_items_out_of_inventory(self):
+        list_item(self.seller, self.potion, 30, quantity=2)
+        self.assertEqual(get_inventory(self.seller)[self.potion.pk], 3)
+        with self.assertRaises(MarketError):
+            list_item(self.seller, self.potion, 30, quantity=4)
+
+    def test_buy_cheapest_transfers_gold_item_and_reputation(self):
+        expensive = list_item(self.seller, self.potion, 60)
+        cheap = list_item(self.seller, self.potion, 40)
+        self.assertEqual([row[0] for row in order_book(self.potion)], [cheap.pk, expensive.pk])
+        self.assertEqual(list(search(rarity=self.rare, max_price=50)), [cheap])
+
+        sold = buy(self.buyer, item=self.potion)
+        self.assertEqual(sold.pk, cheap.pk)
+        self.seller.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual((self.seller.gold, self.buyer.gold), (40, 60))
+        self.assertEqual(get_inventory(self.buyer), {self.potion.pk: 1})
+        self.assertEqual(Auction.objects.get(pk=cheap.pk).buyer, self.buyer)
+
+        reputation = AuctionReputation.objects.get(character=self.seller)
+        self.assertEqual((reputation.total_sales, reputation.total_earnings), (1, 40))
+
+    def test_failed_purchase_changes_nothing(self):
+        listing = list_item(self.seller, self.potion, 150)
+        with self.assertRaises(MarketError):
+            buy(self.buyer, auction_id=listing.pk)
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.gold, 100)
+        self.assertEqual(Auction.objects.get(pk=listing.pk).status, Auction.ACTIVE)
+
+        cancel_listing(self.seller, listing.pk)
+        self.assertEqual(get_inventory(self.seller)[self.potion.pk], 5)
+        with self.assertRaises(MarketError):
+            buy(self.buyer, auction_id=listing.pk)
@@ -50,6 +50,65 @@ class MissionProgressTest(TestCase):
         logs = EventLog.objects.filter(character=self.character)
         self.assertTrue(logs.filter(message__icontains="completed the step").exists())
 
+    def test_complete_step_query_count(self):
+        # progress update, mission update, mission refresh, one bulk event insert
+        with self.assertNumQueries(4):
+            self.assertTrue(self.char_mission.complete_step(self.step1))
+        # plus the reward claim and the gold/xp credit
+        with self.assertNumQueries(6):
+            self.assertTrue(self.char_mission.complete_step(self.step2))
+        self.assertTrue(self.char_mission.completed)
+
+    def test_complete_step_is_idempotent(self):
+        self.assertTrue(self.char_mission.complete_step(self.step1))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.char_mission.complete_step(self.step1))
+        self.assertEqual(
+            EventLog.objects.filter(character=self.character, message__icontains="completed the step").count(), 1
+        )
+
+    def test_next_command_index_follows_progress(self):
+        self.char_mission.refresh_from_db()
+        self.assertEqual(self.char_mission.next_step, self.step1)
+        self.assertEqual(self.char_mission.next_command, "go north")
+
+        self.char_mission.complete_step(self.step1)
+        self.char_mission.refresh_from_db()
+        self.assertEqual(self.char_mission.next_step, self.step2)
+        self.assertEqual(self.char_mission.next_command, "explore ruin")
+
+        self.char_mission.complete_step(self.step2)
+        self.char_mission.refresh_from_db()
+        self.assertTrue(self.char_mission.completed)
+        self.assertIsNone(self.char_mission.next_command)
+
+    def test_step_edit_updates_next_command(self):
+        self.step1.description = "Go  North!"
+        self.step1.save()
+        self.char_mission.refresh_from_db()
+        self.assertEqual(self.char_mission.next_command, normalize("Go  North!"))
+
+    def assertNextStep(self, step):
+        self.char_mission.refresh_from_db()
+        self.assertEqual(self.char_mission.next_step, step)
+        self.assertEqual(self.char_mission.next_command, step.normalized_description if step else None)
+
+    def test_deleting_the_current_step_moves_the_index_on(self):
+        self.step1.delete()
+        self.assertNextStep(self.step2)
+
+    def test_deleting_progress_moves_the_index_on(self):
+        self.char_mission.progress.filter(step=self.step1).delete()
+        self.assertNextStep(self.step2)
+        self.char_mission.progress.all().delete()
+        self.assertNextStep(None)
+
+    def test_reordering_steps_moves_the_index(self):
+        self.step2.order = 0
+        self.step2.save()
+        self.assertNextStep(self.step2)
+        self.assertEqual(self.char_mission.current_step().step, self.step2)
+
 
 class TextCommandTest(TestCase):
     def setUp(self):
@@ -71,6 +130,31 @@ class TextCommandTest(TestCase):
         self.assertTrue(command_log)
         self.assertTrue(mission_log)
 
+    def test_command_lookup_does_not_scale_with_open_missions(self):
+        for i in range(5):
+            mission = Mission.objects.create(name=f"Side {i}", type=self.mtype)
+            step = MissionStep.objects.create(mission=mission, description=f"side step {i}", order=1)
+            cm = CharacterMission.objects.create(character=self.character, mission=mission)
+            CharacterMissionProgress.objects.create(character_mission=cm, step=step)
+
+        TextCommand.objects.create(character=self.character, command="look around")  # caches the location
+        with self.assertNumQueries(3):
+            # insert command, single index lookup, one bulk insert for both log lines
+            TextCommand.objects.create(character=self.character, command="nothing to see")
+
+    def test_matched_command_query_count(self):
+        TextCommand.objects.create(character=self.character, command="look around")  # caches the location
+        CharacterMissionProgress.objects.filter(character_mission=self.char_mission).update(completed=False)
+        # insert command, index lookup, the four complete_step writes and
+        # reads, one bulk event insert; no lazy load of the character
+        with self.assertNumQueries(7):
+            TextCommand.objects.create(character=self.character, command="leete el libro")
+
+    def test_stale_index_falls_back(self):
+        CharacterMissionProgress.objects.filter(character_mission=self.char_mission).update(completed=True)
+        TextCommand.objects.create(character=self.character, command="leete el libro")
+        self.assertTrue(EventLog.objects.filter(character=self.character, message__startswith="Nothing happened").exists())
+
     def test_command_does_not_match_wrong_input(self):
         # Should not complete with wrong command
         TextCommand.objects.create(character=self.character, command="run away")
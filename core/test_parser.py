@@ -0,0 +1,70 @@
+from django.test import TestCase
+from core.models import (
+    Character, CharacterMission, CharacterMissionProgress, CommandAlias, EventLog, Mission, MissionStep, TextCommand,
+)
+from core.parser import CommandParser, edit_distance, get_parser, normalize_token
+
+
+class CommandParserTest(TestCase):
+    def setUp(self):
+        self.parser = CommandParser(
+            ["go north", "open the chest", "read the ancient book", "pull lever"],
+            [("n", "go north"), ("walk", "go"), ("grab", "take")],
+        )
+
+    def test_normalization_is_per_word_and_cached(self):
+        self.assertEqual(self.parser.canonical("  Open, THE chest! "), "open the chest")
+        normalize_token("Léete")
+        hits = normalize_token.cache_info().hits
+        self.assertEqual(normalize_token("Léete"), "leete")
+        self.assertEqual(normalize_token.cache_info().hits, hits + 1)
+
+    def test_aliases(self):
+        self.assertEqual(self.parser.candidates("n"), {"n", "go north"})
+        self.assertEqual(self.parser.candidates("walk north"), {"walk north", "go north"})
+        self.assertEqual(self.parser.candidates("Go North!"), {"go north!", "go north"})
+
+    def test_typos_within_bounds(self):
+        self.assertIn("read the ancient book", self.parser.candidates("raed the ancent book"))
+        self.assertIn("pull lever", self.parser.candidates("pull levr"))
+        self.assertIn("go north", self.parser.candidates("go nroth"))
+        self.assertEqual(self.parser.candidates("push lover"), {"push lover"})
+
+    def test_edit_distance_counts_swaps_as_one_edit(self):
+        self.assertEqual(edit_distance("north", "nroth"), 1)
+        self.assertEqual(edit_distance("lever", "levr"), 1)
+        self.assertEqual(edit_distance("chest", "chess"), 1)
+        self.assertEqual(edit_distance("ancient", "ancnet"), 2)
+
+    def test_closest_phrase_wins(self):
+        parser = CommandParser(["pull lever", "pull levers"], [])
+        self.assertEqual(parser.correct("leverz"), {"lever", "levers"})
+        self.assertEqual(parser.correct("lever"), {"lever"})
+        self.assertEqual(parser.candidates("pull leverz"), {"pull leverz", "pull lever", "pull levers"})
+
+
+class FuzzyTextCommandTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Wanderer")
+        mission = Mission.objects.create(name="North Road", description="")
+        step = MissionStep.objects.create(mission=mission, description="Go north", order=1)
+        self.cm = CharacterMission.objects.create(character=self.character, mission=mission)
+        CharacterMissionProgress.objects.create(character_mission=self.cm, step=step)
+        CommandAlias.objects.create(alias="walk", replacement="go")
+
+    def test_alias_completes_the_step(self):
+        TextCommand.objects.create(character=self.character, command="walk north")
+        self.cm.refresh_from_db()
+        self.assertTrue(self.cm.completed)
+
+    def test_typo_completes_the_step(self):
+        TextCommand.objects.create(character=self.character, command="go nroth")
+        self.cm.refresh_from_db()
+        self.assertTrue(self.cm.completed)
+        self.assertTrue(EventLog.objects.filter(message__contains="completed the mission").exists())
+
+    def test_parser_is_rebuilt_when_aliases_change(self):
+        parser = get_parser()
+        self.assertIs(get_parser(), parser)
+        CommandAlias.objects.create(alias="head", replacement="go")
+        self.assertIn("go north", get_parser().candidates("head north"))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from core import presence
+from core.models import Character, CharacterLocation, EventLog, TextCommand, Zone
+
+
+class PresenceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.square = Zone.objects.create(name="Square", description="", fallback_message="The crowd ignores you.")
+        self.docks = Zone.objects.create(name="Docks", description="")
+        self.characters = [Character.objects.create(name=f"Wanderer {i}") for i in range(3)]
+
+    def move(self, character, zone):
+        with self.captureOnCommitCallbacks(execute=True):
+            return presence.move_character(character, zone)
+
+    def test_movement_keeps_zones_in_sync(self):
+        for character in self.characters:
+            self.move(character, self.square)
+        self.move(self.characters[0], self.docks)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(presence.whos_here(self.square), {c.pk: c.name for c in self.characters[1:]})
+            self.assertEqual(presence.whos_here(self.docks), {self.characters[0].pk: self.characters[0].name})
+            self.assertEqual(presence.zone_of(self.characters[0]), self.docks.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CharacterLocation.objects.get(character=self.characters[1]).delete()
+        self.assertEqual(list(presence.whos_here(self.square)), [self.characters[2].pk])
+
+    def test_rolled_back_move_is_not_seen(self):
+        self.move(self.characters[0], self.square)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                presence.move_character(self.characters[0], self.docks)
+                raise ValueError
+        self.assertEqual(list(presence.whos_here(self.square)), [self.characters[0].pk])
+        self.assertEqual(presence.whos_here(self.docks), {})
+
+    def test_evicted_zone_is_rebuilt_from_locations(self):
+        self.move(self.characters[0], self.square)
+        cache.delete(presence.ZONE_KEY.format(zone_id=self.square.pk))
+        self.assertEqual(list(presence.whos_here(self.square)), [self.characters[0].pk])
+
+    def test_busy_zone_is_rebuilt_and_lock_left_alone(self):
+        self.move(self.characters[0], self.square)
+        lock = presence.LOCK_KEY.format(zone_id=self.square.pk)
+        cache.set(lock, "someone else", 60)
+
+        self.move(self.characters[1], self.square)
+        self.assertEqual(cache.get(lock), "someone else")
+        self.assertEqual(set(presence.whos_here(self.square)), {self.characters[0].pk, self.characters[1].pk})
+
+    @override_settings(PRESENCE_TTL_SECONDS=60)
+    def test_stale_entries_expire(self):
+        self.move(self.characters[0], self.square)
+        self.move(self.characters[1], self.square)
+        CharacterLocation.objects.filter(character=self.characters[0]).update(last_moved=now() - timedelta(minutes=5))
+        cache.delete(presence.ZONE_KEY.format(zone_id=self.square.pk))
+        self.assertEqual(list(presence.whos_here(self.square)), [self.characters[1].pk])
+
+    def test_failed_command_uses_zone_fallback(self):
+        self.move(self.characters[0], self.square)
+        TextCommand.objects.create(character=self.characters[0], command="dance")
+        self.assertTrue(EventLog.objects.filter(character=self.characters[0], message="The crowd ignores you.").exists())
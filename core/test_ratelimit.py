@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from core import ratelimit
+from core.history import get_history
+from core.models import Character
+from core.ratelimit import CacheBackend, LocalBackend, TokenBucket
+
+
+class TokenBucketTest(TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(burst=3, rate=0.5)
+        state = None
+        for _ in range(3):
+            state, wait = bucket.take(state, 100.0)
+            self.assertEqual(wait, 0)
+        state, wait = bucket.take(state, 100.0)
+        self.assertEqual(wait, 2.0)
+        state, wait = bucket.take(state, 102.0)
+        self.assertEqual(wait, 0)
+
+    def test_local_buckets_expire(self):
+        backend = LocalBackend(burst=2, rate=1.0, sweep_seconds=0)
+        backend.consume("a")
+        self.assertIn("a", backend.buckets)
+        backend.buckets["a"] = (0, backend.buckets["a"][1] - 5)
+        backend.consume("b")
+        self.assertNotIn("a", backend.buckets)
+
+    def test_cache_backend_shares_buckets(self):
+        cache.delete("core:ratelimit:shared")
+        first, second = CacheBackend(burst=1, rate=0.01), CacheBackend(burst=1, rate=0.01)
+        self.assertEqual(first.consume("shared"), 0)
+        self.assertGreater(second.consume("shared"), 0)
+
+
+class CommandRateLimitMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="spammer")
+        self.character = Character.objects.create(user=self.user, name="Spammer")
+        self.url = f"/game/characters/{self.character.pk}/commands/"
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(ratelimit, "_limiter", LocalBackend(burst=2, rate=0.01))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self):
+        return self.client.post(self.url, {"command": "wave"}, content_type="application/json")
+
+    def test_rejects_before_any_query(self):
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.post().status_code, 202)
+        with self.assertNumQueries(0):
+            response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "100")
+        self.assertEqual(get_history(self.character), ["wave", "wave"])
+
+    def test_bucket_is_per_character_across_clients(self):
+        self.assertEqual(self.post().status_code, 202)
+        self.client.cookies.clear()
+        self.client.force_login(self.user)
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.post().status_code, 429)
+
+    @override_settings(COMMAND_RATE_LIMIT_PER_CLIENT=True)
+    def test_per_client_buckets(self):
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.post().status_code, 429)
+        self.client.cookies.clear()
+        self.client.force_login(self.user)
+        self.assertEqual(self.post().status_code, 202)
+
+    def test_other_views_are_not_limited(self):
+        for _ in range(3):
+            self.post()
+        self.assertNotEqual(self.client.get(f"/api/characters/{self.character.pk}/").status_code, 429)
+
+    async def test_async_requests_are_limited(self):
+        # Anonymous posts still spend tokens: the limit applies before authentication
+        self.assertEqual((await self.async_client.post(self.url, {"command": "wave"})).status_code, 404)
+        self.assertEqual((await self.async_client.post(self.url, {"command": "wave"})).status_code, 404)
+        self.assertEqual((await self.async_client.post(self.url, {"command": "wave"})).status_code, 429)
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import TestCase
+from core import reputation
+from core.models import Character, CharacterReputation
+
+
+class ReputationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.players = [Character.objects.create(name=f"Player {i}") for i in range(3)]
+        self.npcs = [Character.objects.create(name=f"Elder {i}", is_npc=True) for i in range(3)]
+
+    def test_batched_deltas_stack_and_clamp(self):
+        reputation.adjust_players(self.npcs[0], {player.pk: 600 for player in self.players})
+        with self.assertNumQueries(1):
+            reputation.adjust_players(self.npcs[0], {player.pk: 600 for player in self.players})
+        self.assertEqual(
+            set(CharacterReputation.objects.filter(npc=self.npcs[0]).values_list("reputation", flat=True)),
+            {reputation.REPUTATION_MAX},
+        )
+
+        reputation.adjust_faction(self.players[0], {self.npcs[0].pk: -2500, self.npcs[1].pk: 5})
+        self.assertEqual(reputation.get_reputation(self.players[0], self.npcs[0]), reputation.REPUTATION_MIN)
+        self.assertEqual(reputation.get_reputation(self.players[0], self.npcs[1]), 5)
+        self.assertEqual(reputation.get_reputation(self.players[0], self.npcs[2]), 0)
+
+        reputation.adjust_faction(self.players[2], {self.npcs[2].pk: 5000})
+        self.assertEqual(reputation.get_reputation(self.players[2], self.npcs[2]), reputation.REPUTATION_MAX)
+
+    def test_vector_is_cached_and_invalidated(self):
+        reputation.adjust_faction(self.players[1], {self.npcs[0].pk: 10})
+        reputation.get_reputation_vector(self.players[1])
+        with self.assertNumQueries(0):
+            self.assertEqual(reputation.get_reputation_vector(self.players[1]), {self.npcs[0].pk: 10})
+
+        reputation.adjust_faction(self.players[1], {self.npcs[0].pk: 5})
+        self.assertEqual(reputation.get_reputation(self.players[1], self.npcs[0]), 15)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from core.models import (
+    Character, Item, InventoryItem, Mission, MissionStep, CharacterMission, CharacterMissionProgress,
+)
+from core.rewards import level_for_xp, settle_mission_rewards, settle_rewards
+
+
+class RewardSettlementTest(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Courier", gold=500, xp=80)
+        self.item = Item.objects.create(name="Medal", value=5)
+        self.mission = Mission.objects.create(name="Delivery", reward_gold=100, reward_xp=50, reward_item=self.item)
+        self.step = MissionStep.objects.create(mission=self.mission, description="deliver", order=1)
+        self.char_mission = CharacterMission.objects.create(character=self.character, mission=self.mission)
+        CharacterMissionProgress.objects.create(character_mission=self.char_mission, step=self.step)
+
+    def test_completing_mission_pays_out_once(self):
+        self.char_mission.complete_step(self.step)
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.gold, 600)
+        self.assertEqual(self.character.xp, 130)
+        self.assertEqual(self.character.level, level_for_xp(130))
+        self.assertEqual(InventoryItem.objects.get(character=self.character, item=self.item).quantity, 1)
+
+        self.assertFalse(settle_mission_rewards(self.char_mission))
+        self.assertEqual(settle_rewards(), 0)
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.gold, 600)
+
+    def test_incomplete_mission_is_not_paid(self):
+        self.assertFalse(settle_mission_rewards(self.char_mission))
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.gold, 500)
+
+    def test_bulk_settlement_stacks_rewards(self):
+        others = [Character.objects.create(name=f"Runner {i}") for i in range(3)]
+        for character in [self.character, self.character, *others]:
+            CharacterMission.objects.create(character=character, mission=self.mission, completed=True)
+
+        self.assertEqual(settle_rewards(batch_size=2), 5)
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.gold, 700)
+        self.assertEqual(self.character.xp, 180)
+        self.assertEqual(self.character.level, 2)
+        self.assertEqual(InventoryItem.objects.get(character=self.character, item=self.item).quantity, 2)
+        for other in others:
+            other.refresh_from_db()
+            self.assertEqual(other.gold, 600)
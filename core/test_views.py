@@ -0,0 +1,53 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from core.models import Character, EventLog
+
+
+class CommandChannelTest(TransactionTestCase):
+    # Events are published on commit, so these tests need real commits
+    def setUp(self):
+        self.user = User.objects.create_user(username="streamer")
+        self.character = Character.objects.create(user=self.user, name="Streamer")
+        self.commands_url = f"/game/characters/{self.character.pk}/commands/"
+        self.events_url = f"/game/characters/{self.character.pk}/events/"
+
+    async def read_event(self, stream):
+        chunk = (await stream.__anext__()).decode()
+        lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+        return int(lines["id"]), json.loads(lines["data"])["message"]
+
+    async def test_commands_are_pushed_to_the_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.events_url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+
+        posted = await self.async_client.post(self.commands_url, {"command": "wave"}, content_type="application/json")
+        self.assertEqual(posted.status_code, 202)
+
+        _, message = await self.read_event(stream)
+        self.assertEqual(message, "Nothing happened... maybe try something else.")
+        await stream.aclose()
+
+    async def test_reconnect_replays_missed_events(self):
+        first = await EventLog.objects.acreate(character=self.character, message="seen")
+        missed = await EventLog.objects.acreate(character=self.character, message="missed")
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.events_url, headers={"Last-Event-ID": str(first.pk)})
+        stream = response.streaming_content
+        self.assertEqual(await self.read_event(stream), (missed.pk, "missed"))
+        await stream.aclose()
+
+    async def test_other_characters_are_not_reachable(self):
+        other = await User.objects.acreate(username="lurker")
+        await self.async_client.aforce_login(other)
+        response = await self.async_client.post(self.commands_url, {"command": "wave"}, content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(self.events_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_is_refused_under_wsgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.events_url).status_code, 501)
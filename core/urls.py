@@ -0,0 +1,8 @@
+from django.urls import path
+
+from core import views
+
+urlpatterns = [
+    path('characters/<int:character_id>/commands/', views.send_command, name='send-command'),
+    path('characters/<int:character_id>/events/', views.event_stream, name='event-stream'),
+]
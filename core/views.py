@@ -1,3 +1,107 @@
-from django.shortcuts import render
+import asyncio
+import json
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from .history import run_command
+from .models import Character, EventLog, TextCommand
+from .pubsub import character_channel, get_broker
+from .ratelimit import rate_limited
+
+BACKLOG_LIMIT = 500
+
+
+async def _owned_character(request, character_id):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    characters = Character.objects.filter(pk=character_id)
+    if not user.is_staff:
+        characters = characters.filter(user=user)
+    return await characters.afirst()
+
+
+def _not_found():
+    return JsonResponse({"detail": "Not found."}, status=404)
+
+
+@rate_limited
+@require_POST
+async def send_command(request, character_id):
+    """Accept a text command. Its narrative output arrives on the event stream."""
+    character = await _owned_character(request, character_id)
+    if character is None:
+        return _not_found()
+
+    if request.content_type == "application/json":
+        try:
+            command = json.loads(request.body or b"{}").get("command", "")
+        except (ValueError, AttributeError):
+            return JsonResponse({"detail": "Invalid JSON."}, status=400)
+    else:
+        command = request.POST.get("command", "")
+    command = str(command).strip()
+    if not command or len(command) > TextCommand._meta.get_field("command").max_length:
+        return JsonResponse({"detail": "A command of 1-255 characters is required."}, status=400)
+
+    await sync_to_async(run_command)(character, command)
+    return JsonResponse({"accepted": True}, status=202)
+
+
+def _sse(event):
+    data = json.dumps({"message": event["message"], "timestamp": event["timestamp"]})
+    return f"id: {event['id']}\ndata: {data}\n\n"
+
+
+@require_GET
+async def event_stream(request, character_id):
+    """
+    Server-sent events with every new EventLog line of the character.
+
+    Clients reconnecting with Last-Event-ID first get the lines they missed
+    from the database, then live lines from the broker. ASGI only: the WSGI
+    handler reads an async stream to the end before sending anything, which
+    this one never reaches.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "The event stream needs the ASGI server."}, status=501)
+    character = await _owned_character(request, character_id)
+    if character is None:
+        return _not_found()
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    # Subscribe before reading the backlog so nothing falls in between
+    subscription = get_broker().subscribe(character_channel(character.pk))
+
+    async def stream():
+        seen = last_id or 0
+        try:
+            if last_id is not None:
+                backlog = EventLog.objects.filter(character=character, pk__gt=last_id).order_by("pk")[:BACKLOG_LIMIT]
+                async for event in backlog:
+                    seen = event.pk
+                    yield _sse({"id": event.pk, "message": event.message, "timestamp": event.timestamp.isoformat()})
+            while True:
+                try:
+                    message = await subscription.get(timeout=settings.EVENT_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message["id"] > seen:
+                    seen = message["id"]
+                    yield _sse(message)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -24,4 +24,4 @@ EOF
 
 # Levantar servidor
 echo "→ Starting Gunicorn server..."
-gunicorn EchoesOfValue.wsgi
+gunicorn -c gunicorn.conf.py
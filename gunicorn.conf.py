@@ -0,0 +1,63 @@
+"""
+Gunicorn runtime profile, read by the Procfile and entrypoint.sh.
+
+The default is one Uvicorn worker serving the ASGI app: the event stream
+holds connections open, which only async workers handle cheaply.
+GUNICORN_WORKER_CLASS=gthread serves the WSGI app with GUNICORN_THREADS
+threads per worker instead, without the event stream: WSGI cannot send an
+async stream as it goes, so the events/ endpoint answers 501 there and
+clients have to poll the feed API.
+
+Caches, presence, rate limits and the event broker default to process
+memory, so more workers (WEB_CONCURRENCY, about one per core) need
+REDIS_URL set; workers refuse to start otherwise (see core.checks). Keep
+WEB_CONCURRENCY x DB_POOL_MAX_SIZE below the database's max_connections.
+"""
+import os
+import sys
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+asgi = worker_class.startswith("uvicorn")
+wsgi_app = "EchoesOfValue.asgi:application" if asgi else "EchoesOfValue.wsgi:application"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 1 if asgi else 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks never add up
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+# Each worker opens its own pool after the fork; a preloaded app would share sockets
+preload_app = False
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    """
+    Refuse to serve if the worker count needs shared state that is not
+    configured, or if the database (through the pool, when enabled) does
+    not answer.
+    """
+    from django.db import connection
+    from gunicorn.arbiter import Arbiter
+
+    from core.checks import shared_state_errors
+
+    errors = shared_state_errors(worker.cfg.workers)
+    for error in errors:
+        worker.log.error("%s: %s %s", error.id, error.msg, error.hint)
+    if errors:
+        sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception as exc:
+        worker.log.error("Database health check failed: %s", exc)
+        # A boot error makes the arbiter shut down instead of respawning the worker
+        sys.exit(Arbiter.WORKER_BOOT_ERROR)
+    finally:
+        connection.close()
+    worker.log.info("Database health check passed")